@@ -0,0 +1,98 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", "8"))
+ANALYSIS_MAX_PENDING = int(os.getenv("ANALYSIS_MAX_PENDING", "1000"))
+ANALYSIS_RESULT_TTL = int(os.getenv("ANALYSIS_RESULT_TTL", "3600"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class AnalysisQueue:
+    """
+    Runs CV analyses on a bounded worker pool so that text extraction and
+    the blocking LLM call happen off the Flask worker. ``work`` receives the
+    file path and returns ``(body, status_code)``; results are kept for
+    ``result_ttl`` seconds after they finish.
+    """
+
+    def __init__(self, work, max_workers=ANALYSIS_CONCURRENCY,
+                 max_pending=ANALYSIS_MAX_PENDING, result_ttl=ANALYSIS_RESULT_TTL):
+        self.work = work
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-analysis")
+
+    def _pending(self):
+        return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job["finished_at"] and now - job["finished_at"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def submit(self, file_path):
+        with self._lock:
+            self._evict_expired()
+            if self._pending() >= self.max_pending:
+                raise QueueFullError("Analysis queue is full")
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "status": "queued",
+                "file_path": file_path,
+                "body": None,
+                "status_code": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self.jobs[job_id]
+            job["status"] = "running"
+        try:
+            body, status_code = self.work(job["file_path"])
+        except Exception as e:
+            print(f"Error in queued analysis {job_id}: {str(e)}")
+            body, status_code = {
+                "analysis_status": "failed",
+                "error_code": "INTERNAL_SERVER_ERROR",
+                "message": str(e)
+            }, 500
+        with self._lock:
+            job.update({
+                "status": "done" if status_code == 200 else "failed",
+                "body": body,
+                "status_code": status_code,
+                "finished_at": time.time(),
+            })
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict_expired()
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
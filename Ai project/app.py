@@ -1,32 +1,137 @@
-from flask import Flask, request, jsonify
-from cv import analyze_resume_with_gemini
-from embeddings import compute_embedding
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import CrossEncoder, SentenceTransformer,util
+from flask import Flask, request, jsonify, Response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+from cv import analyze_resume_with_gemini, analyze_resumes_with_gemini, resume_cache
+from job_index import JobEmbeddingIndex, job_key
+from retrieval import JobRetriever, RETRIEVAL_TOP_K
+from embedding_cache import cached_encoder
+from embedding_server import embedding_server
+from model_registry import registry, model_path, LazyModel, MODEL_WARMUP
+from analysis_queue import AnalysisQueue, QueueFullError
+from scoring import base_scores, normalize_rows, top_k_indices
+from metrics import timed, start_request, finish_request, server_timing_header, REQUEST_SECONDS, SERVER_TIMING
+import metrics
+from sentence_transformers import util
 from embeddings import compute_embedding
 import numpy as np
 import joblib
 import math
 import os
+import time
+import atexit
 import json
 import torch
 import pandas as pd
 app = Flask(__name__)
 
 
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        with timed("json_serialization"):
+            return super().dumps(obj, **kwargs)
+
+
+app.json = TimedJSONProvider(app)
+
+
+@app.before_request
+def start_request_timing():
+    g.request_started = time.perf_counter()
+    start_request()
+
+
+@app.after_request
+def finish_request_timing(response):
+    elapsed = time.perf_counter() - g.pop("request_started", time.perf_counter())
+    timings = finish_request()
+    REQUEST_SECONDS.observe(
+        elapsed,
+        endpoint=request.url_rule.rule if request.url_rule else "unmatched",
+        method=request.method,
+        status=response.status_code
+    )
+    # opt in per request with "X-Server-Timing: 1" or for every response with SERVER_TIMING=on
+    if SERVER_TIMING or request.headers.get("X-Server-Timing") == "1":
+        response.headers["Server-Timing"] = server_timing_header(timings + [("total", elapsed)])
+    return response
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))  
-MODEL_DIR = os.path.join(BASE_DIR, "modelSalary")
+MODEL_DIR = model_path("salary")
+
+
+def register_pickle(name):
+    path = os.path.join(MODEL_DIR, f"{name}.pkl")
+    registry.register(name, lambda: joblib.load(path))
+    return LazyModel(name)
+
+
+model = register_pickle('salary_predictor')
+edu_importance = register_pickle('edu_importance')
+job_importance = register_pickle('job_importance')
+scaler_X = register_pickle('scaler_X')
+scaler_y = register_pickle('scaler_y')
+embedder = cached_encoder(embedding_server("all-mpnet-base-v2"), "all-mpnet-base-v2")
 
-model = joblib.load(os.path.join(MODEL_DIR, 'salary_predictor.pkl'))
-edu_importance = joblib.load(os.path.join(MODEL_DIR,'edu_importance.pkl'))
-job_importance = joblib.load(os.path.join(MODEL_DIR,'job_importance.pkl'))
-scaler_X = joblib.load(os.path.join(MODEL_DIR, 'scaler_X.pkl'))
-scaler_y = joblib.load(os.path.join(MODEL_DIR, 'scaler_y.pkl'))
-embedder = SentenceTransformer(r'D:\all-mpnet-base-v2')
-# embedder = SentenceTransformer(r'F:\model\all-mpnet-base-v2')
 
 
+def build_analysis_response(result):
+    if result.get("error") == "NOT_A_CV":
+        return {
+            "analysis_status": "failed",
+            "error_code": "NOT_A_CV",
+            "message": result.get("message", "Uploaded file is not a CV")
+        }, 422
+
+    parser_output = result.get("parser_output", {})
+
+    skills = parser_output.get("skills", [])
+    education = parser_output.get("education", {})
+    experience_years = parser_output.get("experience_years", 0)
+
+
+    if not skills or not education or experience_years == 0:
+        return {
+            "analysis_status": "failed",
+            "error_code": "INCOMPLETE_CV",
+            "message": "CV is missing required information"
+        }, 422
+
+    return {
+        "analysis_status": "complete",
+        "parser_output": {
+            "summary": parser_output.get("summary", ""),
+            "skills": skills,
+            "education": {
+                "degree": education.get("degree", ""),
+                "university": education.get("university", ""),
+                "major": education.get("major", "")
+            },
+            "certifications": parser_output.get("certifications", []),
+            "languages": parser_output.get("languages", ["Arabic"]),
+            "location": parser_output.get("location", ""),
+            "experience_years": experience_years
+        },
+        "email": result.get("email"),
+        "phone": result.get("phone"),
+        "estimated_experience_years": result.get(
+            "estimated_experience_years",
+            experience_years
+        )
+    }, 200
+
+
+def run_analysis(file_path):
+    return build_analysis_response(analyze_resume_with_gemini(file_path))
+
+
+analysis_queue = AnalysisQueue(run_analysis)
+
 
 @app.route("/analyze", methods=["POST"])
 def analyze():
@@ -48,64 +153,93 @@ def analyze():
                 "message": "CV file path is missing"
             }), 400
 
-        result = analyze_resume_with_gemini(file_path)
-
-        if result.get("error") == "NOT_A_CV":
+        if data.get("async") or request.args.get("async") == "1":
+            try:
+                analysis_id = analysis_queue.submit(file_path)
+            except QueueFullError as e:
+                return jsonify({
+                    "analysis_status": "failed",
+                    "error_code": "QUEUE_FULL",
+                    "message": str(e)
+                }), 503
             return jsonify({
-                "analysis_status": "failed",
-                "error_code": "NOT_A_CV",
-                "message": result.get("message", "Uploaded file is not a CV")
-            }), 422
+                "analysis_status": "queued",
+                "analysis_id": analysis_id
+            }), 202
 
-        parser_output = result.get("parser_output", {})
+        body, status_code = run_analysis(file_path)
+        return jsonify(body), status_code
 
-        skills = parser_output.get("skills", [])
-        education = parser_output.get("education", {})
-        experience_years = parser_output.get("experience_years", 0)
+    except Exception as e:
+        print(f"Error in analyze route: {str(e)}")
+        return jsonify({
+            "analysis_status": "failed",
+            "error_code": "INTERNAL_SERVER_ERROR",
+            "message": str(e)
+        }), 500
 
 
-        if not skills or not education or experience_years == 0:
+@app.route("/analyze-batch", methods=["POST"])
+def analyze_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        file_paths = data.get("file_paths") or []
+        if not file_paths:
             return jsonify({
                 "analysis_status": "failed",
-                "error_code": "INCOMPLETE_CV",
-                "message": "CV is missing required information"
-            }), 422
+                "error_code": "MISSING_FILE_PATH",
+                "message": "CV file paths are missing"
+            }), 400
 
-        return jsonify({
-            "analysis_status": "complete",
-            "parser_output": {
-                "summary": parser_output.get("summary", ""),
-                "skills": skills,
-                "education": {
-                    "degree": education.get("degree", ""),
-                    "university": education.get("university", ""),
-                    "major": education.get("major", "")
-                },
-                "certifications": parser_output.get("certifications", []),
-                "languages": parser_output.get("languages", ["Arabic"]),
-                "location": parser_output.get("location", ""),
-                "experience_years": experience_years
-            },
-            "email": result.get("email"),
-            "phone": result.get("phone"),
-            "estimated_experience_years": result.get(
-                "estimated_experience_years",
-                experience_years
-            )
-        }), 200
+        results = []
+        for file_path, result in zip(file_paths, analyze_resumes_with_gemini(file_paths)):
+            if result.get("error") == "EXTRACTION_FAILED":
+                body, status_code = {
+                    "analysis_status": "failed",
+                    "error_code": "EXTRACTION_FAILED",
+                    "message": result.get("message", "")
+                }, 500
+            else:
+                body, status_code = build_analysis_response(result)
+            results.append({"file_path": file_path, "status_code": status_code, **body})
+        return jsonify({"results": results}), 200
 
     except Exception as e:
-        print(f"Error in analyze route: {str(e)}")
+        print(f"Error in analyze-batch route: {str(e)}")
         return jsonify({
             "analysis_status": "failed",
             "error_code": "INTERNAL_SERVER_ERROR",
             "message": str(e)
         }), 500
 
+
+@app.route("/analyze/<analysis_id>", methods=["GET"])
+def analysis_status(analysis_id):
+    job = analysis_queue.get(analysis_id)
+    if job is None:
+        return jsonify({
+            "analysis_status": "failed",
+            "error_code": "ANALYSIS_NOT_FOUND",
+            "message": "Unknown or expired analysis id"
+        }), 404
+
+    if job["status"] in ("queued", "running"):
+        return jsonify({
+            "analysis_status": job["status"],
+            "analysis_id": analysis_id
+        }), 202
+
+    return jsonify(job["body"]), job["status_code"]
+
     
 
-modelembe = SentenceTransformer(r'D:\multi-qa-mpnet-base-dot-v1')
-# modelembe = SentenceTransformer(r'F:\model\multi-qa-mpnet-base-dot-v1')
+# same server as embeddings.model, so multi-qa-mpnet is only loaded once
+modelembe = cached_encoder(embedding_server("multi-qa-mpnet-base-dot-v1"), "multi-qa-mpnet-base-dot-v1")
+atexit.register(embedder.save)
+atexit.register(modelembe.save)
+
+job_retriever = JobRetriever()
+job_index = JobEmbeddingIndex(modelembe, retriever=job_retriever)
 
 
 @app.route("/get-similarity", methods=["POST"])
@@ -125,69 +259,66 @@ def get_similarity():
     if not resume_text or not jobs:
         return jsonify([])
 
-    job_scores = []
-
     resume_skill_list = list(resume_skills)
     if resume_skill_list:
-        resume_skill_embs = modelembe.encode(resume_skill_list, convert_to_tensor=True)
+        resume_skill_embs = modelembe.encode(resume_skill_list, convert_to_numpy=True)
     else:
         resume_skill_embs = None
 
-    for job in jobs:
-        job_skills = set([s.lower() for s in job.get("requiredSkills") or []])
-        job_edu = set([e.lower() for e in job.get("requiredEducation") or []])
-        job_exp = float(job.get("requiredExperience") or 0)
-
-        skill_score = 0.0
-        job_skill_list = list(job_skills)
-        if resume_skill_embs is not None and job_skill_list:
-            job_skill_embs = modelembe.encode(job_skill_list, convert_to_tensor=True)
-            cos_sim_matrix = util.cos_sim(resume_skill_embs, job_skill_embs)  
-            skill_score = cos_sim_matrix.max(dim=0).values.mean().item()
-        
-
-        edu_score = 0.0
-        for edu in resume_education:
-            for job_edu_req in job_edu:
-                if edu in job_edu_req or job_edu_req in edu:
-                    edu_score = 1.0
-                    break
-            if edu_score == 1.0:
-                break
-
-        exp_score = min(resume_experience / max(job_exp, 1), 1.0)
-        base_score = 0.5 * skill_score + 0.3 * edu_score + 0.2 * exp_score
-
-        job_scores.append({
-            "job": job,
-            "base_score": base_score
-        })
+    job_entries = job_index.sync(jobs)
+    resume_emb = modelembe.encode(resume_text, convert_to_numpy=True)
+
+    if len(jobs) > RETRIEVAL_TOP_K:
+        positions = {job_key(job["id"]): i for i, job in enumerate(jobs)}
+        candidates = job_retriever.search(resume_emb, RETRIEVAL_TOP_K, allowed_keys=positions)
+        candidates = sorted(positions[key] for key in candidates)
+        jobs = [jobs[i] for i in candidates]
+        job_entries = [job_entries[i] for i in candidates]
+
+    with timed("similarity"):
+        base = base_scores(
+            resume_skill_embs,
+            [entry["skill_embs"] for entry in job_entries],
+            resume_education,
+            [set([e.lower() for e in job.get("requiredEducation") or []]) for job in jobs],
+            resume_experience,
+            [float(job.get("requiredExperience") or 0) for job in jobs],
+        )
 
-    job_scores = sorted(job_scores, key=lambda x: x["base_score"], reverse=True)
-    top_jobs = job_scores[:50]
-    job_texts = [
-        f"{j['job']['title']} {j['job']['description']} {' '.join(j['job']['requiredSkills'])}"
-        for j in top_jobs
-    ]
-    job_ids = [j['job']['id'] for j in top_jobs]
+        top = top_k_indices(base, 50)
+        job_ids = [jobs[i]['id'] for i in top]
 
-    resume_emb = modelembe.encode(resume_text, convert_to_tensor=True)
-    job_embs = modelembe.encode(job_texts, convert_to_tensor=True)
+        job_embs = np.stack([job_entries[i]['text_emb'] for i in top])
 
-    text_scores = util.cos_sim(resume_emb, job_embs).cpu().numpy().flatten()
+        text_scores = normalize_rows(job_embs) @ normalize_rows(resume_emb[None, :])[0]
+        final_scores = 0.5 * base[top] + 0.5 * text_scores
 
-    results = []
-    for jid, base_s, text_s in zip(job_ids, [j['base_score'] for j in top_jobs], text_scores):
-        final_score = 0.5 * base_s + 0.5 * text_s
-        results.append({
-            "jobId": jid,
-            "final_score": float(final_score)
-        })
+    results = [
+        {"jobId": jid, "final_score": float(score)}
+        for jid, score in zip(job_ids, final_scores)
+    ]
 
     results.sort(key=lambda x: x["final_score"], reverse=True)
     return jsonify(results[:10])
 
 
+@app.route("/jobs/index", methods=["POST"])
+def index_jobs():
+    data = request.get_json(silent=True) or {}
+    jobs = data.get("jobs") or []
+    if not all(isinstance(job, dict) and "id" in job for job in jobs):
+        return jsonify({"error": "Every job needs an id"}), 400
+
+    job_index.sync(jobs)
+    return jsonify({"indexed": len(jobs), "total": len(job_index)}), 200
+
+
+@app.route("/jobs/index/<job_id>", methods=["DELETE"])
+def remove_indexed_job(job_id):
+    removed = job_index.remove(job_id)
+    return jsonify({"removed": removed, "total": len(job_index)}), 200
+
+
 
 
 
@@ -247,57 +378,188 @@ def categorize_job_title(job_title):
         return 'Other'
 
 
-def match_skills(candidate_skills, job_skills, threshold=0.7):
-    if not candidate_skills or not job_skills:
-        return []
-    candidate_emb = embedder.encode(candidate_skills, convert_to_tensor=True)
-    job_emb = embedder.encode(job_skills, convert_to_tensor=True)
-    cosine_scores = util.cos_sim(candidate_emb, job_emb)
-    matched_skills = []
-    for i, c in enumerate(candidate_skills):
-        for j, jskill in enumerate(job_skills):
-            if cosine_scores[i][j] > threshold:
-                matched_skills.append(jskill)
-    return list(set(matched_skills))
-
-def predict_salary(candidate_skills, job_skills, education, years_experience, job_title):
-    matched_skills = match_skills(candidate_skills, job_skills)
-    if candidate_skills and job_skills:
-        candidate_emb = embedder.encode(candidate_skills, convert_to_tensor=True)
-        job_emb = embedder.encode(job_skills, convert_to_tensor=True)
-        cosine_scores = util.cos_sim(candidate_emb, job_emb)
-        skill_score = float(cosine_scores.mean().item())
-    else:
-        skill_score = 0.0
+def encode_application(candidate_skills, job_skills, job_title=None, job_description=None):
+    """
+    Encodes everything an application needs in one embedder call. Title and
+    description (plus the skills-as-text resume) are only encoded when given.
+    """
+    candidate_skills = list(candidate_skills or [])
+    job_skills = list(job_skills or [])
+    texts = candidate_skills + job_skills
+    with_text = job_title is not None or job_description is not None
+    if with_text:
+        texts += [" ".join(candidate_skills), job_title or "", job_description or ""]
+
+    embs = embedder.encode(texts, convert_to_tensor=True) if texts else None
+    n_c, n_j = len(candidate_skills), len(job_skills)
+
+    encoding = {"skill_scores": None}
+    if n_c and n_j:
+        encoding["skill_scores"] = util.cos_sim(embs[:n_c], embs[n_c:n_c + n_j])
+    if with_text:
+        encoding["texts"] = texts[n_c + n_j:]
+        encoding["text_embs"] = embs[n_c + n_j:]
+    return encoding
+
+
+def encode_job(job_skills, job_title, job_description):
+    job_skills = list(job_skills or [])
+    texts = [job_title or "", job_description or ""]
+    embs = embedder.encode(job_skills + texts, convert_to_tensor=True)
+    return {
+        "skills": job_skills,
+        "skill_embs": embs[:len(job_skills)],
+        "texts": texts,
+        "text_embs": embs[len(job_skills):],
+    }
+
+
+def encode_applicants(candidate_skill_lists, job_encoding):
+    """
+    Per-candidate encodings (same shape as ``encode_application``) against an
+    already encoded job: the distinct skills and skills-as-text resumes of
+    all candidates go through the embedder as one batch.
+    """
+    unique_skills = list(dict.fromkeys(s for skills in candidate_skill_lists for s in skills))
+    resume_texts = [" ".join(skills) for skills in candidate_skill_lists]
+    embs = embedder.encode(unique_skills + resume_texts, convert_to_tensor=True)
+    resume_embs = embs[len(unique_skills):]
+
+    all_scores = None
+    if unique_skills and job_encoding["skills"]:
+        all_scores = util.cos_sim(embs[:len(unique_skills)], job_encoding["skill_embs"])
+    row = {s: i for i, s in enumerate(unique_skills)}
+
+    encodings = []
+    for i, skills in enumerate(candidate_skill_lists):
+        skill_scores = None
+        if skills and all_scores is not None:
+            skill_scores = all_scores[[row[s] for s in skills]]
+        encodings.append({
+            "skill_scores": skill_scores,
+            "texts": [resume_texts[i]] + job_encoding["texts"],
+            "text_embs": torch.cat([resume_embs[i:i + 1], job_encoding["text_embs"]]),
+        })
+    return encodings
 
-    combined_text = " ".join(matched_skills + [job_title])
-    job_category = categorize_job_title(combined_text)
 
-    grouped_education = group_education(education)
-    edu_encoded = edu_importance.get(grouped_education, 0)
-    job_encoded = job_importance.get(job_category, 1)
+def parse_education(value):
+    if isinstance(value, list):
+        return value[0] if len(value) > 0 else None
+    return value
 
-    X_client = pd.DataFrame([[edu_encoded, job_encoded, years_experience]],
-                            columns=['Education_Encoded', 'Job_Encoded', 'Years of Experience'])
 
-    X_client = X_client[model.feature_names_in_]
-    X_client[['Years of Experience']] = scaler_X.transform(X_client[['Years of Experience']])
+def skill_matches(candidate_skills, job_skills, threshold=0.7, cosine_scores=None):
+    """
+    For every job skill, the closest candidate skill and its score, taken
+    from one column-wise max over the similarity matrix.
+    """
+    if not candidate_skills or not job_skills:
+        return []
+    if cosine_scores is None:
+        cosine_scores = encode_application(candidate_skills, job_skills)["skill_scores"]
+    best_scores, best_idx = cosine_scores.max(dim=0)
+    matched = (best_scores > threshold).tolist()
+    return [
+        {
+            "job_skill": jskill,
+            "candidate_skill": candidate_skills[i],
+            "score": round(score, 3),
+            "matched": m
+        }
+        for jskill, i, score, m in zip(job_skills, best_idx.tolist(), best_scores.tolist(), matched)
+    ]
 
-    y_scaled = model.predict(X_client)
-    y_pred = scaler_y.inverse_transform(y_scaled.reshape(-1, 1))[0, 0]
 
+def matched_job_skills(matches):
+    return list(dict.fromkeys(m["job_skill"] for m in matches if m["matched"]))
 
-    edu_score = 1.0 if grouped_education != 'Other' else 0.5
-    exp_score = min(years_experience / 10, 1.0)  
 
-    final_similarity_score = round(0.6 * skill_score + 0.25 * edu_score + 0.15 * exp_score, 3)
+def match_skills(candidate_skills, job_skills, threshold=0.7, cosine_scores=None):
+    return matched_job_skills(skill_matches(candidate_skills, job_skills, threshold, cosine_scores))
 
-    return {
-        'estimated_salary': round(y_pred, 2),
-        'job_category': job_category,
-        'matched_skills': matched_skills,
-        'similarity_score': final_similarity_score
+def salary_skill_inputs(candidate_skills, job_skills, job_title, encoding):
+    cosine_scores = encoding["skill_scores"]
+    matched_skills = match_skills(candidate_skills, job_skills, cosine_scores=cosine_scores)
+    if cosine_scores is not None:
+        skill_score = float(cosine_scores.mean().item())
+    else:
+        skill_score = 0.0
+    return matched_skills, skill_score, " ".join(matched_skills + [job_title])
+
+
+def estimate_salaries(educations, category_texts, years_experience):
+    """
+    Runs the salary model on N rows in one pass. Education and job title
+    strings are grouped once per distinct value, and the model, scaler_X and
+    scaler_y each see a single feature matrix instead of one row per call.
+    """
+    edu_groups = {e: group_education(e) for e in dict.fromkeys(map(str, educations))}
+    categories = {t: categorize_job_title(t) for t in dict.fromkeys(map(str, category_texts))}
+    grouped_education = [edu_groups[str(e)] for e in educations]
+    job_categories = [categories[str(t)] for t in category_texts]
+
+    features = {
+        'Education_Encoded': [edu_importance.get(e, 0) for e in grouped_education],
+        'Job_Encoded': [job_importance.get(c, 1) for c in job_categories],
+        'Years of Experience': years_experience,
     }
+    feature_names = list(model.feature_names_in_)
+    X = np.column_stack([np.asarray(features[name], dtype=float) for name in feature_names])
+    years_col = feature_names.index('Years of Experience')
+
+    with timed("salary_predict"):
+        # one frame per batch keeps sklearn's fitted feature names check quiet
+        X[:, years_col] = scaler_X.transform(
+            pd.DataFrame(X[:, [years_col]], columns=['Years of Experience'])
+        ).ravel()
+        y_scaled = model.predict(pd.DataFrame(X, columns=feature_names))
+        y_pred = scaler_y.inverse_transform(np.asarray(y_scaled).reshape(-1, 1))[:, 0]
+
+    return grouped_education, job_categories, y_pred
+
+
+def predict_salaries(applications):
+    """
+    Salary estimates for many (candidate, job) pairs. Each application is a
+    dict with candidate_skills, job_skills, education, years_experience,
+    job_title and an optional encoding; results keep the input order.
+    """
+    skill_inputs = []
+    for a in applications:
+        encoding = a.get("encoding")
+        if encoding is None:
+            encoding = encode_application(a["candidate_skills"], a["job_skills"])
+        skill_inputs.append(salary_skill_inputs(a["candidate_skills"], a["job_skills"], a["job_title"], encoding))
+
+    years_experience = [a["years_experience"] for a in applications]
+    grouped_education, job_categories, y_pred = estimate_salaries(
+        [a["education"] for a in applications], [text for _, _, text in skill_inputs], years_experience
+    )
+
+    results = []
+    for (matched_skills, skill_score, _), grouped, category, years, salary in zip(
+            skill_inputs, grouped_education, job_categories, years_experience, y_pred):
+        edu_score = 1.0 if grouped != 'Other' else 0.5
+        exp_score = min(years / 10, 1.0)
+        results.append({
+            'estimated_salary': round(float(salary), 2),
+            'job_category': category,
+            'matched_skills': matched_skills,
+            'similarity_score': round(0.6 * skill_score + 0.25 * edu_score + 0.15 * exp_score, 3)
+        })
+    return results
+
+
+def predict_salary(candidate_skills, job_skills, education, years_experience, job_title, encoding=None):
+    return predict_salaries([{
+        "candidate_skills": candidate_skills,
+        "job_skills": job_skills,
+        "education": education,
+        "years_experience": years_experience,
+        "job_title": job_title,
+        "encoding": encoding,
+    }])[0]
 
 
 
@@ -308,11 +570,7 @@ def predict_salary_endpoint():
 
         candidate_skills = data.get("candidate_skills", [])
         job_skills = data.get("job_required_skills", [])
-        education = (
-            data.get("candidate_education")[0]
-            if isinstance(data.get("candidate_education"), list) and len(data.get("candidate_education")) > 0
-            else data.get("candidate_education")
-        )
+        education = parse_education(data.get("candidate_education"))
         years_experience = float(data.get("candidate_experience", 0))
         job_title = data.get("job_title", "")
 
@@ -335,6 +593,74 @@ def predict_salary_endpoint():
 
 
 
+def encode_salary_pairs(pairs):
+    """
+    Skill similarity matrices for many (candidate, job) pairs from one
+    embedder call over the distinct skills of all pairs.
+    """
+    unique_skills = list(dict.fromkeys(
+        s for candidate_skills, job_skills in pairs for s in list(candidate_skills) + list(job_skills)
+    ))
+    embs = embedder.encode(unique_skills, convert_to_tensor=True) if unique_skills else None
+    row = {s: i for i, s in enumerate(unique_skills)}
+
+    encodings = []
+    for candidate_skills, job_skills in pairs:
+        skill_scores = None
+        if candidate_skills and job_skills:
+            skill_scores = util.cos_sim(
+                embs[[row[s] for s in candidate_skills]], embs[[row[s] for s in job_skills]]
+            )
+        encodings.append({"skill_scores": skill_scores})
+    return encodings
+
+
+@app.route("/predict-salary-batch", methods=["POST"])
+def predict_salary_batch():
+    try:
+        data = request.get_json(silent=True) or {}
+        items = data.get("applications") or []
+        if not items:
+            return jsonify({"error": "Missing applications"}), 400
+
+        results = [{"id": item.get("id")} for item in items]
+        applications, positions = [], []
+        for i, item in enumerate(items):
+            candidate_skills = item.get("candidate_skills") or []
+            education = parse_education(item.get("candidate_education"))
+            if not education or not candidate_skills:
+                results[i]["error"] = "Missing candidate education or skills"
+                continue
+            try:
+                years_experience = float(item.get("candidate_experience") or 0)
+            except (TypeError, ValueError):
+                results[i]["error"] = "Invalid candidate experience"
+                continue
+            applications.append({
+                "candidate_skills": candidate_skills,
+                "job_skills": item.get("job_required_skills") or [],
+                "education": education,
+                "years_experience": years_experience,
+                "job_title": item.get("job_title", ""),
+            })
+            positions.append(i)
+
+        if applications:
+            encodings = encode_salary_pairs([(a["candidate_skills"], a["job_skills"]) for a in applications])
+            for application, encoding in zip(applications, encodings):
+                application["encoding"] = encoding
+            for i, salary in zip(positions, predict_salaries(applications)):
+                salary["monthly_salary"] = round(salary["estimated_salary"] / 12, 2)
+                results[i].update(salary)
+
+        return jsonify({"results": results}), 200
+
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
+
 def text_similarity_embeddings(t1: str, t2: str):
     if not t1 or not t2:
         return 0.0
@@ -343,6 +669,39 @@ def text_similarity_embeddings(t1: str, t2: str):
     return float(sim)
 
 
+def encoded_text_similarity(encoding, i, j):
+    texts, embs = encoding["texts"], encoding["text_embs"]
+    if not texts[i] or not texts[j]:
+        return 0.0
+    return float(util.cos_sim(embs[i], embs[j]).item())
+
+
+def acceptance_score(candidate_skills, job_required_skills, job_title, job_description, encoding=None):
+    if encoding is None:
+        encoding = encode_application(candidate_skills, job_required_skills, job_title, job_description)
+
+    with timed("similarity"):
+        matches = skill_matches(candidate_skills, job_required_skills, cosine_scores=encoding["skill_scores"])
+        matched = matched_job_skills(matches)
+        skill_match_score = len(matched) / len(job_required_skills) if job_required_skills else 1.0
+
+        # texts are [resume_text, job_title, job_description]
+        desc_score = encoded_text_similarity(encoding, 0, 2)
+        title_score = encoded_text_similarity(encoding, 0, 1)
+
+    score = (
+        (skill_match_score * 0.6) +
+        (title_score * 0.20) +
+        (desc_score * 0.20)
+    )
+
+    return {
+        "acceptance_score": round(float(score), 3),
+        "matched_skills": matched,
+        "skill_matches": [m for m in matches if m["matched"]]
+    }
+
+
 @app.route("/predict-acceptance", methods=["POST"])
 def predict_acceptance():
     data = request.get_json()
@@ -352,24 +711,149 @@ def predict_acceptance():
     job_required_skills = data.get("job_required_skills", [])
     job_description = data.get("job_description", "")
 
+    return jsonify(acceptance_score(candidate_skills, job_required_skills, job_title, job_description))
 
-    matched = match_skills(candidate_skills, job_required_skills)
-    skill_match_score = len(matched) / len(job_required_skills) if job_required_skills else 1.0
 
-    resume_text = " ".join(candidate_skills)
-    desc_score = text_similarity_embeddings(resume_text, job_description)
-    title_score = text_similarity_embeddings(resume_text, job_title)
+@app.route("/score-application", methods=["POST"])
+def score_application():
+    try:
+        data = request.get_json()
 
-    acceptance_score = (
-        (skill_match_score * 0.6) +
-        (title_score * 0.20) +
-        (desc_score * 0.20)
-    )
+        candidate_skills = data.get("candidate_skills", [])
+        job_skills = data.get("job_required_skills", [])
+        job_title = data.get("job_title", "")
+        job_description = data.get("job_description", "")
+        education = parse_education(data.get("candidate_education"))
+        years_experience = float(data.get("candidate_experience", 0))
 
+        if not education or not candidate_skills:
+            return jsonify({"error": "Missing candidate education or skills"}), 400
+
+        encoding = encode_application(candidate_skills, job_skills, job_title, job_description)
+        acceptance = acceptance_score(candidate_skills, job_skills, job_title, job_description, encoding)
+        salary = predict_salary(candidate_skills, job_skills, education, years_experience, job_title, encoding)
+
+        return jsonify({
+            "acceptance_score": acceptance["acceptance_score"],
+            "matched_skills": acceptance["matched_skills"],
+            "skill_matches": acceptance["skill_matches"],
+            "estimated_salary": salary["estimated_salary"],
+            "monthly_salary": round(salary["estimated_salary"] / 12, 2),
+            "job_category": salary["job_category"],
+            "similarity_score": salary["similarity_score"]
+        }), 200
+
+    except Exception as e:
+        import traceback
+        print(traceback.format_exc())
+        return jsonify({"error": str(e)}), 500
+
+RANK_CHUNK_SIZE = int(os.getenv("RANK_CHUNK_SIZE", "64"))
+
+
+def score_applicants(candidates, job_skills, job_title, job_description, encodings):
+    """
+    Scores a chunk of candidates against one job: acceptance per candidate,
+    then one salary model pass for every candidate that got that far.
+    """
+    results, applications, scored = [], [], []
+    for candidate, encoding in zip(candidates, encodings):
+        candidate_skills = candidate.get("candidate_skills") or []
+        education = parse_education(candidate.get("candidate_education"))
+        result = {"id": candidate.get("id")}
+        results.append(result)
+        if not education or not candidate_skills:
+            result["error"] = "Missing candidate education or skills"
+            continue
+        try:
+            years_experience = float(candidate.get("candidate_experience") or 0)
+            acceptance = acceptance_score(candidate_skills, job_skills, job_title, job_description, encoding)
+        except Exception as e:
+            result["error"] = str(e)
+            continue
+        result.update({
+            "acceptance_score": acceptance["acceptance_score"],
+            "matched_skills": acceptance["matched_skills"],
+            "skill_matches": acceptance["skill_matches"],
+        })
+        applications.append({
+            "candidate_skills": candidate_skills,
+            "job_skills": job_skills,
+            "education": education,
+            "years_experience": years_experience,
+            "job_title": job_title,
+            "encoding": encoding,
+        })
+        scored.append(result)
+
+    if applications:
+        try:
+            salaries = predict_salaries(applications)
+        except Exception as e:
+            for result in scored:
+                candidate_id = result.get("id")
+                result.clear()
+                result.update({"id": candidate_id, "error": str(e)})
+            return results
+        for result, salary in zip(scored, salaries):
+            result.update({
+                "estimated_salary": salary["estimated_salary"],
+                "monthly_salary": round(salary["estimated_salary"] / 12, 2),
+                "job_category": salary["job_category"],
+                "similarity_score": salary["similarity_score"]
+            })
+    return results
+
+
+@app.route("/rank-applicants", methods=["POST"])
+def rank_applicants():
+    data = request.get_json(silent=True) or {}
+    job = data.get("job") or {}
+    candidates = data.get("candidates") or []
+    if not job or not candidates:
+        return jsonify({"error": "Missing job or candidates"}), 400
+
+    job_skills = job.get("job_required_skills") or []
+    job_title = job.get("job_title", "")
+    job_description = job.get("job_description", "")
+
+    def generate():
+        job_encoding = encode_job(job_skills, job_title, job_description)
+        for start in range(0, len(candidates), RANK_CHUNK_SIZE):
+            chunk = candidates[start:start + RANK_CHUNK_SIZE]
+            encodings = encode_applicants(
+                [c.get("candidate_skills") or [] for c in chunk], job_encoding
+            )
+            for result in score_applicants(chunk, job_skills, job_title, job_description, encodings):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    return jsonify({
+        "ready": registry.ready,
+        "models": registry.status(),
+    }), 200 if registry.ready else 503
+
+
+@app.route("/resume-cache", methods=["GET"])
+def resume_cache_stats():
+    if resume_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **resume_cache.stats()})
+
+
+@app.route("/embedding-cache", methods=["GET"])
+def embedding_cache_stats():
     return jsonify({
-        "acceptance_score": round(float(acceptance_score), 3),
-        "matched_skills": matched
+        "all-mpnet-base-v2": {**embedder.stats(), "batching": embedder.model.stats()},
+        "multi-qa-mpnet-base-dot-v1": {**modelembe.stats(), "batching": modelembe.model.stats()},
     })
 
+if MODEL_WARMUP == "on":
+    registry.warm_up(background=True)
+
 if __name__ == "__main__":
     app.run(port=5000, debug=False, use_reloader=False)
@@ -0,0 +1,99 @@
+import os
+import time
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "on")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+
+
+class SemanticAnswerCache:
+    """
+    Caches LLM answers by question embedding. A question hits when an
+    entry with the same retrieved context id has cosine similarity of at
+    least ``threshold``, so paraphrases of an answered question reuse it.
+    Entries expire after ``ttl`` seconds and are evicted least recently
+    used beyond ``max_entries``.
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, ttl=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_SIZE):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._entries = OrderedDict()
+        self._by_context = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def get(self, vector, context_id):
+        vector = self._unit(vector)
+        now = time.time()
+        with self._lock:
+            ids = [i for i in list(self._by_context.get(context_id, ())) if not self._expired(i, now)]
+            if ids:
+                scores = np.stack([self._entries[i]["vector"] for i in ids]) @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(ids[best])
+                    self.hits += 1
+                    return self._entries[ids[best]]["answer"]
+            self.misses += 1
+        return None
+
+    def put(self, vector, context_id, answer):
+        now = time.time()
+        with self._lock:
+            entry_id = next(self._ids)
+            self._entries[entry_id] = {
+                "vector": self._unit(vector),
+                "context_id": context_id,
+                "answer": answer,
+                "created_at": now,
+            }
+            self._by_context.setdefault(context_id, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def _expired(self, entry_id, now):
+        if now - self._entries[entry_id]["created_at"] <= self.ttl:
+            return False
+        self._drop(entry_id)
+        return True
+
+    def _drop(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        ids = self._by_context[entry["context_id"]]
+        ids.discard(entry_id)
+        if not ids:
+            del self._by_context[entry["context_id"]]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "llm_calls_saved": self.hits,
+                "skipped_with_history": self.skipped,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+            }
@@ -1,8 +1,12 @@
-from flask import Flask, request, Response
+from flask import Flask, request, Response, jsonify, stream_with_context
 from flask_cors import CORS
 from google import genai
-import json, os
+import json, os, time
 from dotenv import load_dotenv
+from faq_search import BM25Index
+from vector_search import VectorRetriever, FAQ_INDEX_DIR
+from session_store import session_store
+from answer_cache import SemanticAnswerCache, ANSWER_CACHE
 
 
 app = Flask(__name__)
@@ -23,47 +27,62 @@ with open(DATA_PATH, "r", encoding="utf-8") as f:
     FAQ_DATA = json.load(f)
 
 
-class FAISSIndex:
-    def __init__(self, data):
-        self.data = data
+FAQ_INTENT_MIN_MATCHED = int(os.getenv("FAQ_INTENT_MIN_MATCHED", "2"))
 
-    def similarity_search(self, query, k=1):
-        query_words = set(query.split())
-        best_match = None
-        max_score = 0
+faq_index = BM25Index(FAQ_DATA)
 
-        for item in self.data:
-            q_words = set(item["question"].split())
-            score = len(query_words & q_words)
-            if score > max_score:
-                max_score = score
-                best_match = item
 
-        return [best_match] if best_match and max_score > 0 else []
+def faq_intent_match(user_question: str):
+    hits = faq_index.search(user_question, k=1, min_matched=FAQ_INTENT_MIN_MATCHED)
+    return hits[0]["item"]["answer"] if hits else None
 
-vectorstore = FAISSIndex(FAQ_DATA)
 
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
 
-def faq_intent_match(user_question: str):
-    user_words = set(user_question.split())
-    for item in FAQ_DATA:
-        if len(user_words & set(item["question"].split())) >= 2:
-            return item["answer"]
-    return None
+try:
+    from helper import load_embedding_model
+    retriever = VectorRetriever(load_embedding_model(), FAQ_INDEX_DIR)
+    print(f"Loaded FAISS index from {FAQ_INDEX_DIR} ({retriever.index.ntotal} vectors)")
+except Exception as e:
+    # faiss / langchain / the MiniLM weights are missing: keep answering from the BM25 index
+    print("FAISS retrieval unavailable, falling back to BM25:", e)
+    retriever = None
 
 
-chat_history = {}  
+def retrieve_context(question: str):
+    """Context text for the prompt and an id naming the documents it came from."""
+    if retriever is not None:
+        docs = retriever.search(question, k=RETRIEVAL_TOP_K)
+        if docs:
+            return "\n\n".join(doc["content"] for doc in docs), "|".join(doc["id"] for doc in docs)
+    docs = faq_index.similarity_search(question)
+    if docs:
+        return docs[0]["answer"], docs[0]["question"]
+    return "لا توجد معلومات حالياً.", ""
 
 
-def generate_with_gemini(session_id, question, context=""):
-    history = chat_history.get(session_id, [])
+chat_history = session_store()
+
+# clients that send no session_id all share this one
+ANONYMOUS_SESSION = "default"
+
+# paraphrase matching needs the MiniLM embeddings of the vector retriever
+answer_cache = SemanticAnswerCache() if ANSWER_CACHE == "on" and retriever is not None else None
+
+
+GEMINI_MODEL = "models/gemini-2.5-flash"
+GEMINI_ERROR_ANSWER = "حدث خطأ أثناء معالجة سؤالك."
+
+
+def build_prompt(session_id, question, context=""):
+    history = chat_history.history(session_id)
 
     history_text = ""
-    for h in history[-4:]:  
+    for h in history:
         history_text += f"المستخدم: {h['user']}\n"
         history_text += f"المساعد: {h['bot']}\n"
 
-    prompt = f"""
+    return f"""
 أنت "رشاد بوت"، المساعد الذكي لمنصة إرشاد.
 أجب باللغة العربية وبأسلوب واضح ومختصر.
 
@@ -79,50 +98,215 @@ def generate_with_gemini(session_id, question, context=""):
 الإجابة:
 """
 
+
+def generate_with_gemini(session_id, question, context=""):
+    prompt = build_prompt(session_id, question, context)
+
     try:
         response = client.models.generate_content(
-            model="models/gemini-2.5-flash",
+            model=GEMINI_MODEL,
             contents=prompt
         )
 
         answer = response.candidates[0].content.parts[0].text.strip()
 
-        history.append({"user": question, "bot": answer})
-        chat_history[session_id] = history
+        chat_history.append(session_id, question, answer)
 
         return answer
 
     except Exception as e:
         print("Gemini Error:", e)
-        return "حدث خطأ أثناء معالجة سؤالك."
+        return GEMINI_ERROR_ANSWER
 
 
-def generate_answer(session_id, question: str):
+def stream_with_gemini(session_id, question, context="", timings=None, on_complete=None, on_error=None):
+    """
+    Yields the answer chunk by chunk as Gemini generates it; the full
+    answer goes into the session history (and to ``on_complete``) once
+    the stream is complete. A failed stream is reported to ``on_error``
+    when given, otherwise as the error answer if nothing was sent yet.
+    """
+    timings = {} if timings is None else timings
+    prompt = build_prompt(session_id, question, context)
+    started = time.perf_counter()
+    chunks = []
 
+    try:
+        for chunk in client.models.generate_content_stream(model=GEMINI_MODEL, contents=prompt):
+            text = chunk.text or ""
+            if not chunks:
+                text = text.lstrip()
+            if not text:
+                continue
+            if not chunks:
+                timings["first_token"] = time.perf_counter() - started
+            chunks.append(text)
+            yield text
 
+    except Exception as e:
+        print("Gemini Error:", e)
+        if on_error is not None:
+            on_error(e)
+        elif not chunks:
+            yield GEMINI_ERROR_ANSWER
+        return
+
+    finally:
+        timings["generation"] = time.perf_counter() - started
+
+    answer = "".join(chunks).strip()
+    chat_history.append(session_id, question, answer)
+    if on_complete is not None:
+        on_complete(answer)
+
+
+def find_answer(question: str, timings):
+    """
+    FAQ answer, retrieved context and its id for a question; the answer is
+    None when the LLM must be called.
+    """
+    started = time.perf_counter()
     faq = faq_intent_match(question)
+    context, context_id = (None, None) if faq else retrieve_context(question)
+    timings["retrieval"] = time.perf_counter() - started
+    return faq, context, context_id
+
+
+def lookup_cached_answer(session_id, question, context_id, timings):
+    """
+    A stored answer to a paraphrase of ``question`` with the same context,
+    plus the question embedding for storing a fresh answer. Any session
+    whose history goes into the prompt is skipped, the shared anonymous
+    one included: the answer depends on the earlier turns.
+    """
+    if answer_cache is None:
+        return None, None
+    if chat_history.history(session_id):
+        answer_cache.record_skip()
+        return None, None
+    started = time.perf_counter()
+    vector = retriever.embed(question)
+    answer = answer_cache.get(vector, context_id)
+    timings["answer_cache"] = time.perf_counter() - started
+    return answer, vector
+
+
+def generate_answer(session_id, question: str, timings=None):
+    timings = {} if timings is None else timings
+
+    faq, context, context_id = find_answer(question, timings)
     if faq:
         return faq
 
+    cached, vector = lookup_cached_answer(session_id, question, context_id, timings)
+    if cached:
+        chat_history.append(session_id, question, cached)
+        return cached
+
+    started = time.perf_counter()
+    answer = generate_with_gemini(session_id, question, context)
+    timings["generation"] = time.perf_counter() - started
+    if vector is not None and answer != GEMINI_ERROR_ANSWER:
+        answer_cache.put(vector, context_id, answer)
+    return answer
+
+
+def sse_event(data, event=None):
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in data.split("\n")]
+    return "\n".join(lines) + "\n\n"
+
+
+def server_timing_header(timings):
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
+
+
+def log_timings(session_id, timings):
+    print(f"[{session_id}] timings:", {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()})
+
+
+def stream_answer(session_id, msg):
+    """
+    Streams the answer as Server-Sent Events when the client accepts
+    text/event-stream, otherwise as chunked plain text. FAQ hits are sent
+    at once without calling the LLM, and so are answer cache hits. An SSE
+    stream ends with a ``done`` event, or an ``error`` event if Gemini fails.
+    """
+    timings = {}
+    faq, context, context_id = find_answer(msg, timings)
+    cached, vector = (None, None) if faq else lookup_cached_answer(session_id, msg, context_id, timings)
+    if cached:
+        chat_history.append(session_id, msg, cached)
+    use_sse = request.accept_mimetypes.best == "text/event-stream"
+
+    def store(answer):
+        if vector is not None and answer:
+            answer_cache.put(vector, context_id, answer)
+
+    def generate():
+        errors = []
+        if faq or cached:
+            chunks = [faq or cached]
+        else:
+            chunks = stream_with_gemini(
+                session_id, msg, context, timings, on_complete=store, on_error=errors.append if use_sse else None
+            )
+        for chunk in chunks:
+            yield sse_event(chunk) if use_sse else chunk
+        if errors:
+            yield sse_event(GEMINI_ERROR_ANSWER, event="error")
+        elif use_sse:
+            yield sse_event("", event="done")
+        log_timings(session_id, timings)
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream" if use_sse else "text/plain"
+    )
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
-    docs = vectorstore.similarity_search(question)
-    context = docs[0]["answer"] if docs else "لا توجد معلومات حالياً."
-
-
-    return generate_with_gemini(session_id, question, context)
 
 @app.route("/get", methods=["POST"])
 def chat():
     msg = request.form.get("msg", "")
-    session_id = request.form.get("session_id", "default")
+    session_id = request.form.get("session_id", ANONYMOUS_SESSION)
 
     if not msg:
         return Response("سؤال فارغ", mimetype="text/plain")
 
-    answer = generate_answer(session_id, msg)
+    if request.form.get("stream") in ("1", "true") or request.accept_mimetypes.best == "text/event-stream":
+        return stream_answer(session_id, msg)
+
+    timings = {}
+    answer = generate_answer(session_id, msg, timings)
     print(f"[{session_id}] BOT:", answer)
+    log_timings(session_id, timings)
+
+    response = Response(answer, mimetype="text/plain")
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
+@app.route("/session-stats", methods=["GET"])
+def session_stats():
+    return jsonify(chat_history.stats())
+
+
+@app.route("/answer-cache-stats", methods=["GET"])
+def answer_cache_stats():
+    if answer_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **answer_cache.stats()})
+
 
-    return Response(answer, mimetype="text/plain")
+@app.route("/retrieval-stats", methods=["GET"])
+def retrieval_stats():
+    if retriever is None:
+        return jsonify({"backend": "bm25", "faq_entries": len(FAQ_DATA)})
+    return jsonify({"backend": "faiss", **retriever.stats()})
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8000, debug=True)
@@ -0,0 +1,74 @@
+import re
+import math
+import heapq
+
+
+DIACRITICS = re.compile(r"[\u064B-\u0652\u0670\u0640]")  # harakat, dagger alef, tatweel
+CHAR_MAP = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+})
+TOKEN = re.compile(r"\w+")
+
+
+def normalize_arabic(text):
+    """Folds the spelling variants users mix up: hamza/alef forms, taa marbuta, alef maqsura, diacritics."""
+    return DIACRITICS.sub("", str(text)).translate(CHAR_MAP).lower()
+
+
+def tokenize(text):
+    return TOKEN.findall(normalize_arabic(text))
+
+
+class BM25Index:
+    """
+    Inverted index over the FAQ questions, built once at load time.
+    Every posting stores its precomputed BM25 weight, so a query only
+    touches the posting lists of its own terms.
+    """
+
+    def __init__(self, data, field="question", k1=1.5, b=0.75):
+        self.data = data
+        self.postings = {}
+
+        doc_terms = [tokenize(item.get(field, "")) for item in data]
+        avg_len = (sum(len(terms) for terms in doc_terms) / len(doc_terms)) if doc_terms else 0
+
+        frequencies = {}
+        for doc_id, terms in enumerate(doc_terms):
+            for term in terms:
+                tf = frequencies.setdefault(term, {})
+                tf[doc_id] = tf.get(doc_id, 0) + 1
+
+        n_docs = len(doc_terms)
+        for term, tf in frequencies.items():
+            idf = math.log(1 + (n_docs - len(tf) + 0.5) / (len(tf) + 0.5))
+            postings = []
+            for doc_id, count in tf.items():
+                length_norm = 1 - b + b * len(doc_terms[doc_id]) / avg_len
+                postings.append((doc_id, idf * count * (k1 + 1) / (count + k1 * length_norm)))
+            self.postings[term] = postings
+
+    def search(self, query, k=1, min_matched=1):
+        """
+        Top ``k`` entries sharing at least ``min_matched`` query terms, as
+        dicts with the FAQ item, its BM25 score and the shared term count.
+        """
+        scores, matched = {}, {}
+        for term in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+                matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        candidates = (hit for hit in scores.items() if matched[hit[0]] >= min_matched)
+        best = heapq.nlargest(k, candidates, key=lambda hit: hit[1])
+        return [
+            {"item": self.data[doc_id], "score": round(score, 4), "matched": matched[doc_id]}
+            for doc_id, score in best
+        ]
+
+    def similarity_search(self, query, k=1):
+        return [hit["item"] for hit in self.search(query, k)]
@@ -0,0 +1,205 @@
+import os
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(BASE_DIR, "sessions", "sessions.sqlite3"))
+SESSION_HISTORY_TURNS = int(os.getenv("SESSION_HISTORY_TURNS", "4"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(24 * 3600)))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def turn_bytes(user, bot):
+    return len(user.encode("utf-8")) + len(bot.encode("utf-8"))
+
+
+class MemorySessionStore:
+    """
+    In-process session store. Each session keeps only its last
+    ``max_turns`` turns in a ring buffer; whole sessions are evicted least
+    recently used once they pass ``ttl`` seconds of inactivity, or when
+    there are more than ``max_sessions`` or their text exceeds
+    ``max_bytes``.
+    """
+
+    def __init__(self, max_turns=SESSION_HISTORY_TURNS, ttl=SESSION_TTL,
+                 max_sessions=SESSION_MAX_SESSIONS, max_bytes=SESSION_MAX_BYTES):
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def history(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            if time.time() - session["last_seen"] > self.ttl:
+                self._drop(session_id)
+                return []
+            return [{"user": user, "bot": bot} for user, bot in session["turns"]]
+
+    def append(self, session_id, user, bot):
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and now - session["last_seen"] > self.ttl:
+                self._drop(session_id)
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                session = {"turns": deque(maxlen=self.max_turns), "bytes": 0}
+            if len(session["turns"]) == self.max_turns:
+                dropped = turn_bytes(*session["turns"][0])
+                session["bytes"] -= dropped
+                self.bytes -= dropped
+            session["turns"].append((user, bot))
+            session["bytes"] += turn_bytes(user, bot)
+            self.bytes += turn_bytes(user, bot)
+            session["last_seen"] = now
+            # re-inserting keeps the dict ordered by last activity
+            self._sessions[session_id] = session
+            self._evict(now)
+
+    def _drop(self, session_id):
+        session = self._sessions.pop(session_id)
+        self.bytes -= session["bytes"]
+        self.evicted += 1
+
+    def _evict(self, now):
+        while self._sessions:
+            session_id, oldest = next(iter(self._sessions.items()))
+            if (now - oldest["last_seen"] > self.ttl or len(self._sessions) > self.max_sessions
+                    or self.bytes > self.max_bytes):
+                self._drop(session_id)
+            else:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self.bytes,
+                "evicted": self.evicted,
+                "max_sessions": self.max_sessions,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SQLiteSessionStore:
+    """
+    Session store in a local SQLite file (WAL mode), so several worker
+    processes share conversations and they survive restarts. Same limits
+    as the memory store except ``max_bytes``: the database lives on disk.
+    """
+
+    def __init__(self, path=SESSION_DB_PATH, max_turns=SESSION_HISTORY_TURNS, ttl=SESSION_TTL,
+                 max_sessions=SESSION_MAX_SESSIONS):
+        self.path = path
+        self.max_turns = max_turns
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.evicted = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS session_turns ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " session_id TEXT NOT NULL,"
+            " user TEXT NOT NULL,"
+            " bot TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS session_turns_session ON session_turns (session_id, id)")
+        self._conn.commit()
+
+    def history(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return []
+            if time.time() - row[0] > self.ttl:
+                self._drop([(session_id,)])
+                self._conn.commit()
+                return []
+            rows = self._conn.execute(
+                "SELECT user, bot FROM session_turns WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, self.max_turns)
+            ).fetchall()
+        return [{"user": user, "bot": bot} for user, bot in reversed(rows)]
+
+    def append(self, session_id, user, bot):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and now - row[0] > self.ttl:
+                # an expired conversation starts over instead of picking up its old turns
+                self._drop([(session_id,)])
+            self._conn.execute(
+                "INSERT INTO session_turns (session_id, user, bot) VALUES (?, ?, ?)", (session_id, user, bot)
+            )
+            self._conn.execute(
+                "DELETE FROM session_turns WHERE session_id = ? AND id NOT IN ("
+                " SELECT id FROM session_turns WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                (session_id, session_id, self.max_turns)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, last_seen) VALUES (?, ?)", (session_id, now)
+            )
+            expired = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE last_seen < ?", (now - self.ttl,)
+            ).fetchall()
+            overflow = self._conn.execute(
+                "SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?", (self.max_sessions,)
+            ).fetchall()
+            removed = set(expired) | set(overflow)
+            if removed:
+                self._drop(removed)
+            self._conn.commit()
+
+    def _drop(self, session_ids):
+        # both deletes go through an index on session_id, never a scan of all turns
+        self._conn.executemany("DELETE FROM sessions WHERE session_id = ?", session_ids)
+        self._conn.executemany("DELETE FROM session_turns WHERE session_id = ?", session_ids)
+        self.evicted += len(session_ids)
+
+    def stats(self):
+        with self._lock:
+            sessions = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            turns = self._conn.execute("SELECT COUNT(*) FROM session_turns").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "sessions": sessions,
+            "turns": turns,
+            "evicted": self.evicted,
+            "max_sessions": self.max_sessions,
+        }
+
+
+def session_store(backend=SESSION_BACKEND):
+    if backend == "memory":
+        return MemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}, expected memory or sqlite")
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+import answer_cache
+from answer_cache import SemanticAnswerCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache, "time", clock)
+    return clock
+
+
+def angle(degrees):
+    radians = np.deg2rad(degrees)
+    return np.array([np.cos(radians), np.sin(radians)], dtype=np.float32)
+
+
+def test_threshold_hit_and_miss(clock):
+    """
+    White-Box Path:
+    Cosine >= threshold returns the answer (vectors need not be unit length); below it misses
+    """
+    cache = SemanticAnswerCache(threshold=0.95, ttl=60, max_entries=10)
+    cache.put(3 * angle(0), "ctx", "answer")
+
+    assert cache.get(angle(15), "ctx") == "answer"   # cos 15 deg ~ 0.966
+    assert cache.get(angle(25), "ctx") is None       # cos 25 deg ~ 0.906
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_context_id_must_match(clock):
+    """
+    White-Box Path:
+    The same question over different retrieved context is a miss
+    """
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.put(angle(0), "ctx-a", "answer a")
+    cache.put(angle(0), "ctx-b", "answer b")
+
+    assert cache.get(angle(0), "ctx-b") == "answer b"
+    assert cache.get(angle(0), "ctx-c") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    """
+    White-Box Path:
+    An entry older than ttl misses and is dropped from the cache
+    """
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.put(angle(0), "ctx", "answer")
+    clock.now += 60
+    assert cache.get(angle(0), "ctx") == "answer"
+
+    clock.now += 1
+    assert cache.get(angle(0), "ctx") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    """
+    White-Box Path:
+    Beyond max_entries the entry not read for longest goes; a hit refreshes an entry
+    """
+    cache = SemanticAnswerCache(threshold=0.99, ttl=60, max_entries=2)
+    cache.put(angle(0), "ctx", "a")
+    cache.put(angle(45), "ctx", "b")
+    assert cache.get(angle(0), "ctx") == "a"
+    cache.put(angle(90), "ctx", "c")
+
+    assert cache.get(angle(45), "ctx") is None
+    assert cache.get(angle(0), "ctx") == "a"
+    assert cache.get(angle(90), "ctx") == "c"
+    assert cache.stats()["size"] == 2
+
+
+def test_record_skip_counter(clock):
+    """
+    White-Box Path:
+    Skipped lookups are counted apart from hits and misses
+    """
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    cache.record_skip()
+    cache.record_skip()
+    stats = cache.stats()
+    assert (stats["skipped_with_history"], stats["hits"], stats["misses"]) == (2, 0, 0)
@@ -0,0 +1,162 @@
+import os
+import importlib.util
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+from session_store import MemorySessionStore
+from answer_cache import SemanticAnswerCache
+
+
+def load_chatbot_app():
+    """Loaded under its own name: a plain ``import app`` would shadow the AI service's app module."""
+    os.environ.setdefault("GEMINI_API_KEY_ChatBOT", "test-key")
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    spec = importlib.util.spec_from_file_location("chatbot_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+chatbot = load_chatbot_app()
+SSE = {"Accept": "text/event-stream"}
+
+
+class FakeModels:
+    """Streams the given chunks, then raises ``error`` if set."""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+
+    def generate_content_stream(self, model, contents):
+        self.calls += 1
+        for text in self.chunks:
+            yield SimpleNamespace(text=text)
+        if self.error is not None:
+            raise self.error
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        part = SimpleNamespace(text="".join(self.chunks))
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    def use(chunks, error=None):
+        models = FakeModels(chunks, error)
+        monkeypatch.setattr(chatbot, "client", SimpleNamespace(models=models))
+        return models
+
+    monkeypatch.setattr(chatbot, "chat_history", MemorySessionStore())
+    monkeypatch.setattr(chatbot, "faq_intent_match", lambda question: None)
+    monkeypatch.setattr(chatbot, "retrieve_context", lambda question: ("context", "ctx-1"))
+    monkeypatch.setattr(chatbot, "answer_cache", None)
+    return use
+
+
+def ask(headers=None, **form):
+    return chatbot.app.test_client().post("/get", data={"session_id": "s1", **form}, headers=headers or {})
+
+
+def test_sse_frames_multiline_chunks_and_ends_with_done(gemini):
+    """
+    White-Box Path:
+    Every line of a chunk gets its own data: field; the stream ends with a done event
+    """
+    gemini(["  first line\nsecond", " more"])
+    response = ask(SSE, msg="سؤال")
+    body = response.get_data(as_text=True)
+
+    assert response.mimetype == "text/event-stream"
+    assert body == (
+        "data: first line\ndata: second\n\n"
+        "data:  more\n\n"
+        "event: done\ndata: \n\n"
+    )
+    assert chatbot.chat_history.history("s1") == [{"user": "سؤال", "bot": "first line\nsecond more"}]
+
+
+def test_sse_stream_error_sends_error_event(gemini):
+    """
+    White-Box Path:
+    Gemini failing mid-stream -> chunks so far, then an error event and no done; nothing recorded
+    """
+    gemini(["partial"], error=RuntimeError("quota"))
+    body = ask(SSE, msg="سؤال").get_data(as_text=True)
+
+    assert body == f"data: partial\n\nevent: error\ndata: {chatbot.GEMINI_ERROR_ANSWER}\n\n"
+    assert "event: done" not in body
+    assert chatbot.chat_history.history("s1") == []
+
+
+def test_stream_without_sse_accept_is_plain_text(gemini):
+    """
+    White-Box Path:
+    stream=1 with a non-SSE Accept header -> raw chunks; an early failure sends the error answer
+    """
+    gemini(["hello", " world"])
+    response = ask({"Accept": "text/plain"}, msg="سؤال", stream="1")
+    assert response.mimetype == "text/plain"
+    assert response.get_data(as_text=True) == "hello world"
+    assert chatbot.chat_history.history("s1") == [{"user": "سؤال", "bot": "hello world"}]
+
+    gemini([], error=RuntimeError("quota"))
+    assert ask(msg="سؤال", stream="1").get_data(as_text=True) == chatbot.GEMINI_ERROR_ANSWER
+
+
+class FakeRetriever:
+    def embed(self, question):
+        return np.array([1.0, 0.0], dtype=np.float32)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = SemanticAnswerCache(threshold=0.9, ttl=60, max_entries=10)
+    monkeypatch.setattr(chatbot, "answer_cache", cache)
+    monkeypatch.setattr(chatbot, "retriever", FakeRetriever())
+    return cache
+
+
+@pytest.mark.parametrize("headers, form", [({}, {}), (SSE, {}), ({}, {"stream": "1"})])
+def test_cache_hit_is_recorded_in_history(gemini, cache, headers, form):
+    """
+    White-Box Path:
+    Plain, SSE and chunked answers from the cache skip Gemini but still record the turn
+    """
+    models = gemini(["fresh"])
+    cache.put(np.array([1.0, 0.0]), "ctx-1", "cached answer")
+
+    body = ask(headers, msg="سؤال", **form).get_data(as_text=True)
+
+    assert "cached answer" in body
+    assert models.calls == 0
+    assert chatbot.chat_history.history("s1") == [{"user": "سؤال", "bot": "cached answer"}]
+
+
+def test_cache_skipped_for_sessions_with_history(gemini, cache):
+    """
+    White-Box Path:
+    A question answered with session history in the prompt neither reads nor fills the cache,
+    for a client's own session and for the shared anonymous one alike
+    """
+    models = gemini(["fresh"])
+    client = chatbot.app.test_client()
+
+    assert client.post("/get", data={"msg": "سؤال"}).get_data(as_text=True) == "fresh"
+    assert client.post("/get", data={"msg": "سؤال"}).get_data(as_text=True) == "fresh"
+    assert models.calls == 2
+    assert len(chatbot.chat_history.history(chatbot.ANONYMOUS_SESSION)) == 2
+    assert cache.stats()["size"] == 1
+
+    # s1 has no history yet: the answer cached from the empty anonymous session is reused
+    assert ask(msg="سؤال").get_data(as_text=True) == "fresh"
+    assert models.calls == 2
+    assert ask(msg="سؤال").get_data(as_text=True) == "fresh"
+    assert models.calls == 3
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["skipped_with_history"] == 2
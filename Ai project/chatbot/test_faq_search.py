@@ -0,0 +1,105 @@
+import os
+import json
+
+from faq_search import BM25Index, normalize_arabic, tokenize
+
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "data.json")
+
+
+def word_overlap_search(data, query):
+    """The matcher BM25Index replaced: most shared whitespace tokens, first item wins ties."""
+    query_words = set(query.split())
+    best_match, max_score = None, 0
+    for item in data:
+        score = len(query_words & set(item["question"].split()))
+        if score > max_score:
+            max_score, best_match = score, item
+    return [best_match] if best_match and max_score > 0 else []
+
+
+def faq(*questions):
+    return [{"question": q, "answer": f"answer {i}"} for i, q in enumerate(questions)]
+
+
+def test_normalize_arabic_folds_spelling_variants():
+    """
+    White-Box Path:
+    Hamza/alef forms, taa marbuta, alef maqsura, hamza seats, diacritics and tatweel are folded
+    """
+    assert normalize_arabic("أإآٱ") == "اااا"
+    assert normalize_arabic("منصة") == "منصه"
+    assert normalize_arabic("مستوى") == "مستوي"
+    assert normalize_arabic("مؤهل") == "موهل"
+    assert normalize_arabic("أنشئ") == "انشي"
+    assert normalize_arabic("كَتَبَ") == "كتب"
+    assert normalize_arabic("مـــرحبا") == "مرحبا"
+    assert normalize_arabic("Python") == "python"
+
+
+def test_tokenize_drops_punctuation():
+    """
+    White-Box Path:
+    Arabic question mark and commas are not part of tokens
+    """
+    assert tokenize("كيف أُنشئ حساباً، في إرشاد؟") == ["كيف", "انشي", "حسابا", "في", "ارشاد"]
+
+
+def test_min_matched_gate_and_top_k_order():
+    """
+    White-Box Path:
+    Entries below min_matched are dropped; hits come back best score first
+    """
+    index = BM25Index(faq(
+        "كيف أسجل في المنصة",
+        "كيف أحذف حسابي من المنصة",
+        "ما هي الرواتب",
+    ))
+
+    hits = index.search("كيف أحذف حسابي", k=3)
+    assert [hit["item"]["answer"] for hit in hits] == ["answer 1", "answer 0"]
+    assert [hit["matched"] for hit in hits] == [3, 1]
+    assert hits[0]["score"] > hits[1]["score"]
+
+    assert [hit["item"]["answer"] for hit in index.search("كيف أحذف حسابي", k=3, min_matched=2)] == ["answer 1"]
+    assert index.search("كيف أحذف حسابي", k=3, min_matched=4) == []
+    assert len(index.search("كيف المنصة", k=1)) == 1
+    assert index.search("وظائف برمجة") == []
+
+
+def test_similarity_search_parity_on_faq_data():
+    """
+    White-Box Path:
+    Every FAQ question still finds itself, and a query sharing no word finds nothing, as with the old matcher
+    """
+    with open(DATA_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    index = BM25Index(data)
+
+    for item in data:
+        assert index.similarity_search(item["question"]) == word_overlap_search(data, item["question"])
+    assert index.similarity_search("xyz") == word_overlap_search(data, "xyz") == []
+
+
+def test_best_score_replaces_first_match():
+    """
+    White-Box Path:
+    On equal word overlap the old matcher took the first item; BM25 prefers the rarer term
+    """
+    data = faq("كيف أحذف الحساب", "كيف أغير كلمة المرور", "التسجيل في المنصة")
+    query = "كيف التسجيل"
+
+    assert word_overlap_search(data, query)[0]["answer"] == "answer 0"
+    assert BM25Index(data).similarity_search(query)[0]["answer"] == "answer 2"
+
+
+def test_normalized_spellings_now_match():
+    """
+    White-Box Path:
+    Different hamza spelling and trailing punctuation no longer prevent a match
+    """
+    data = faq("كيف أنشئ حساب؟", "ما هي الرواتب")
+    query = "كيف انشئ حساب"
+
+    assert BM25Index(data).search(query)[0]["matched"] == 3
+    assert len(set(query.split()) & set(data[0]["question"].split())) == 1
@@ -0,0 +1,145 @@
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**limits):
+        if request.param == "memory":
+            return MemorySessionStore(**limits)
+        return SQLiteSessionStore(path=str(tmp_path / "sessions.sqlite3"), **limits)
+    return make
+
+
+def test_history_keeps_last_max_turns(make_store, clock):
+    """
+    White-Box Path:
+    Only the newest max_turns turns are returned, oldest first; other sessions are untouched
+    """
+    store = make_store(max_turns=2)
+    for i in range(4):
+        store.append("s1", f"q{i}", f"a{i}")
+    store.append("s2", "hello", "hi")
+
+    assert store.history("s1") == [{"user": "q2", "bot": "a2"}, {"user": "q3", "bot": "a3"}]
+    assert store.history("s2") == [{"user": "hello", "bot": "hi"}]
+    assert store.history("missing") == []
+
+
+def test_inactive_sessions_expire(make_store, clock):
+    """
+    White-Box Path:
+    A session idle longer than ttl has no history and is evicted on the next append
+    """
+    store = make_store(ttl=60)
+    store.append("old", "q", "a")
+    clock.now += 30
+    store.append("active", "q", "a")
+    clock.now += 31
+
+    assert store.history("old") == []
+    assert store.history("active") == [{"user": "q", "bot": "a"}]
+    store.append("active", "q2", "a2")
+    assert store.stats()["sessions"] == 1
+    assert store.stats()["evicted"] == 1
+
+
+def test_append_after_expiry_starts_a_new_conversation(make_store, clock):
+    """
+    White-Box Path:
+    Appending to an expired session drops its old turns instead of reviving them
+    """
+    store = make_store(ttl=1)
+    store.append("a", "q1", "old")
+    clock.now += 1.2
+    store.append("a", "q2", "new")
+    assert store.history("a") == [{"user": "q2", "bot": "new"}]
+
+    clock.now += 1.2
+    assert store.history("a") == []
+    clock.now += 0.5
+    store.append("a", "q3", "newer")
+    assert store.history("a") == [{"user": "q3", "bot": "newer"}]
+    assert store.stats()["evicted"] == 2
+
+
+def test_least_recently_active_session_is_evicted(make_store, clock):
+    """
+    White-Box Path:
+    Beyond max_sessions the session with the oldest activity goes, with its turns
+    """
+    store = make_store(max_sessions=2)
+    for session_id in ("a", "b"):
+        clock.now += 1
+        store.append(session_id, "q", "r")
+    clock.now += 1
+    store.append("a", "q2", "r2")
+    clock.now += 1
+    store.append("c", "q", "r")
+
+    assert store.history("b") == []
+    assert len(store.history("a")) == 2
+    assert store.history("c") == [{"user": "q", "bot": "r"}]
+    assert store.stats()["sessions"] == 2
+    assert store.stats()["evicted"] == 1
+
+
+def test_memory_store_byte_budget(clock):
+    """
+    White-Box Path:
+    Sessions are evicted oldest first until the stored text fits max_bytes
+    """
+    store = MemorySessionStore(max_bytes=20)
+    store.append("a", "x" * 8, "y" * 8)
+    clock.now += 1
+    store.append("b", "x" * 8, "y" * 8)
+
+    assert store.history("a") == []
+    assert store.stats()["bytes"] == 16
+
+
+def test_sqlite_store_persists_across_instances(tmp_path, clock):
+    """
+    White-Box Path:
+    A second store on the same file sees the history and the row caps
+    """
+    path = str(tmp_path / "sessions.sqlite3")
+    SQLiteSessionStore(path=path, max_turns=2).append("s1", "q1", "a1")
+    SQLiteSessionStore(path=path, max_turns=2).append("s1", "q2", "a2")
+    store = SQLiteSessionStore(path=path, max_turns=2)
+    store.append("s1", "q3", "a3")
+
+    assert store.history("s1") == [{"user": "q2", "bot": "a2"}, {"user": "q3", "bot": "a3"}]
+    assert store.stats()["turns"] == 2
+
+
+def test_sqlite_eviction_deletes_turns(tmp_path, clock):
+    """
+    White-Box Path:
+    Turns of an evicted session are removed with it
+    """
+    store = SQLiteSessionStore(path=str(tmp_path / "sessions.sqlite3"), max_sessions=1)
+    store.append("a", "q1", "a1")
+    store.append("a", "q2", "a2")
+    clock.now += 1
+    store.append("b", "q", "r")
+
+    assert store.stats()["turns"] == 1
+    assert store._conn.execute("SELECT COUNT(*) FROM session_turns WHERE session_id = 'a'").fetchone()[0] == 0
@@ -0,0 +1,108 @@
+import pickle
+import numpy as np
+
+import vector_search
+from vector_search import VectorRetriever, normalize_query
+
+
+class Doc:
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+class DocStore:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def search(self, doc_id):
+        return self.docs[doc_id]
+
+
+class FlatIndex:
+    """Exact L2 search with the faiss Index.search signature."""
+
+    def __init__(self, vectors):
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.ntotal = len(self.vectors)
+
+    def search(self, queries, k):
+        distances = ((queries[:, None, :] - self.vectors[None, :, :]) ** 2).sum(-1)
+        order = np.argsort(distances, axis=1)[:, :k]
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        ids[:, :order.shape[1]] = order
+        return np.take_along_axis(distances, order, axis=1), ids
+
+
+class FakeEmbeddings:
+    """Maps a few known queries to fixed vectors; records every text it embeds."""
+
+    VECTORS = {"التسجيل": [1.0, 0.0], "الرواتب": [0.0, 1.0]}
+
+    def __init__(self):
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return next((v for word, v in self.VECTORS.items() if word in text), [0.5, 0.5])
+
+
+def make_retriever(tmp_path, monkeypatch, cache_size=8):
+    docs = {"a": Doc("التسجيل في المنصة", {"source": "faq"}), "b": Doc("سلم الرواتب", {"source": "faq"})}
+    with open(tmp_path / "index.pkl", "wb") as f:
+        pickle.dump((DocStore(docs), {0: "a", 1: "b"}), f)
+    monkeypatch.setattr(vector_search, "read_faiss_index", lambda path: FlatIndex([[1.0, 0.0], [0.0, 1.0]]))
+    embeddings = FakeEmbeddings()
+    return VectorRetriever(embeddings, index_dir=str(tmp_path), cache_size=cache_size), embeddings
+
+
+def test_search_returns_nearest_chunks(tmp_path, monkeypatch):
+    """
+    White-Box Path:
+    Index ids map through the docstore to text and metadata, closest first; -1 padding is skipped
+    """
+    retriever, _ = make_retriever(tmp_path, monkeypatch)
+
+    results = retriever.search("كيف التسجيل", k=3)
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert results[0] == {"id": "a", "content": "التسجيل في المنصة", "metadata": {"source": "faq"}, "distance": 0.0}
+    assert results[1]["distance"] == 2.0
+    assert retriever.stats()["vectors"] == 2
+
+
+def test_query_and_result_caches(tmp_path, monkeypatch):
+    """
+    White-Box Path:
+    Spelling variants share one cache entry; the encoder gets the raw query with whitespace collapsed
+    """
+    retriever, embeddings = make_retriever(tmp_path, monkeypatch)
+
+    first = retriever.search("  كيف   أسجل؟ التسجيل ", k=1)
+    assert embeddings.queries == ["كيف أسجل؟ التسجيل"]
+
+    assert retriever.search("كيف اسجل التسجيل", k=1) is first
+    assert embeddings.queries == ["كيف أسجل؟ التسجيل"]
+    stats = retriever.stats()
+    assert stats["result_cache"]["hits"] == 1
+    assert stats["result_cache"]["misses"] == 1
+    assert stats["embedding_cache"] == {"size": 1, "max_size": 8, "hits": 0, "misses": 1}
+
+    # a different k misses the result cache but reuses the cached query vector
+    retriever.search("كيف اسجل التسجيل", k=2)
+    assert len(embeddings.queries) == 1
+    assert retriever.stats()["embedding_cache"]["hits"] == 1
+    assert normalize_query("كيف أسجل؟") == normalize_query("كيف اسجل")
+
+
+def test_caches_evict_least_recently_used(tmp_path, monkeypatch):
+    """
+    White-Box Path:
+    Beyond cache_size the oldest query is re-encoded on its next search
+    """
+    retriever, embeddings = make_retriever(tmp_path, monkeypatch, cache_size=1)
+
+    retriever.search("التسجيل", k=1)
+    retriever.search("الرواتب", k=1)
+    retriever.search("التسجيل", k=1)
+    assert embeddings.queries == ["التسجيل", "الرواتب", "التسجيل"]
+    assert retriever.stats()["result_cache"]["size"] == 1
@@ -0,0 +1,112 @@
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+from faq_search import tokenize
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FAQ_INDEX_DIR = os.getenv("FAQ_INDEX_DIR", os.path.join(BASE_DIR, "faiss_index_saved"))
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+
+
+def normalize_query(query):
+    return " ".join(tokenize(query))
+
+
+def read_faiss_index(path):
+    """Memory-maps the index file when this faiss build supports it, otherwise reads it into memory."""
+    import faiss
+
+    try:
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except (AttributeError, RuntimeError):
+        return faiss.read_index(path)
+
+
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self._data), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class VectorRetriever:
+    """
+    Semantic search over the FAISS index written by store_index.py
+    (index.faiss plus LangChain's docstore in index.pkl). Queries are
+    normalized into cache keys; both the query embedding and the top-k
+    results are kept in LRU caches, so a repeated question never reaches
+    the encoder.
+    """
+
+    def __init__(self, embeddings, index_dir=FAQ_INDEX_DIR, cache_size=QUERY_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.index = read_faiss_index(os.path.join(index_dir, "index.faiss"))
+        with open(os.path.join(index_dir, "index.pkl"), "rb") as f:
+            self.docstore, self.index_to_docstore_id = pickle.load(f)
+        self.embedding_cache = LRUCache(cache_size)
+        self.result_cache = LRUCache(cache_size)
+        self._lock = threading.Lock()
+
+    def embed(self, query):
+        """The normalized query is only the cache key; the encoder sees the user's own spelling."""
+        key = normalize_query(query)
+        with self._lock:
+            vector = self.embedding_cache.get(key)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(" ".join(query.split())), dtype=np.float32)
+            with self._lock:
+                self.embedding_cache.put(key, vector)
+        return vector
+
+    def search(self, query, k=3):
+        """Top ``k`` chunks as dicts with the docstore id, text, metadata and index distance (lower is closer)."""
+        key = (normalize_query(query), k)
+        with self._lock:
+            results = self.result_cache.get(key)
+        if results is not None:
+            return results
+
+        distances, ids = self.index.search(self.embed(query)[None, :], k)
+        results = []
+        for distance, i in zip(distances[0], ids[0]):
+            if i < 0:
+                continue
+            doc_id = self.index_to_docstore_id[int(i)]
+            doc = self.docstore.search(doc_id)
+            results.append({
+                "id": doc_id, "content": doc.page_content, "metadata": doc.metadata, "distance": float(distance)
+            })
+
+        with self._lock:
+            self.result_cache.put(key, results)
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                "vectors": int(self.index.ntotal),
+                "embedding_cache": self.embedding_cache.stats(),
+                "result_cache": self.result_cache.stats(),
+            }
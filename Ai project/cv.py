@@ -1,125 +1,394 @@
 import os
 import re
 import json
+import time
+import atexit
+import threading
+import multiprocessing
 import pdfplumber
 from dotenv import load_dotenv
-from datetime import datetime
-import google.generativeai as genai 
+from concurrent.futures import ProcessPoolExecutor
 from docx import Document
+from resume_cache import ResumeCache, sha256_file, sha256_text
+from cv_fields import EMAIL_PATTERN, PHONE_PATTERN, extract_fields, merge_fields, looks_like_cv
+from local_parser import parse_resume_locally
+from metrics import timed, record
 
 load_dotenv()
+RESUME_LLM = os.getenv("RESUME_LLM", "gemini")
 api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not found in .env file")
-genai.configure(api_key=api_key)
 
 
-def extract_text(file_path):
+class GeminiLLM:
+    """
+    Gemini client configured on the first call, so importing cv.py never
+    pays for the SDK import or needs the API key up front.
+    """
+
+    def __init__(self, model_name="models/gemini-2.5-flash"):
+        self.model_name = model_name
+        self._genai = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        with self._lock:
+            if self._genai is None:
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY not found in .env file")
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                self._genai = genai
+        return self._genai
+
+    def generate(self, prompt):
+        model = self._client().GenerativeModel(self.model_name)
+        response = model.generate_content(prompt)
+        return response.text
+
+
+MOCK_PARSER_OUTPUT = {
+    "summary": "Software engineer with backend and machine learning experience.",
+    "skills": ["Python", "Node.js", "Django", "Machine Learning"],
+    "education": {
+        "degree": "Bachelor",
+        "university": "Damascus University",
+        "major": "Information Engineering"
+    },
+    "certifications": [],
+    "languages": ["Arabic", "English"],
+    "location": "Damascus",
+    "experience_years": 2
+}
+
+
+class MockLLM:
+    """
+    Offline stand-in for Gemini: sleeps ``latency`` seconds to simulate the
+    network call and returns a fixed parser output (one per resume for batch
+    prompts). Used for load tests.
+    """
+
+    def __init__(self, latency=0.0, output=None):
+        self.latency = latency
+        self.output = output or MOCK_PARSER_OUTPUT
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        ids = re.findall(r"<<<RESUME (\d+)>>>", prompt)
+        if ids:
+            return json.dumps([{"id": int(i), **self.output} for i in ids])
+        return json.dumps(self.output)
+
+
+if RESUME_LLM == "mock":
+    llm = MockLLM(latency=float(os.getenv("MOCK_LLM_LATENCY", "0")))
+else:
+    llm = GeminiLLM()
+
+
+resume_cache = ResumeCache() if os.getenv("RESUME_CACHE", "on") != "off" else None
+
+# "llm": always Gemini, "local": gazetteer parser only,
+# "local-first": local parser, falling back to Gemini below the confidence threshold
+RESUME_PARSER = os.getenv("RESUME_PARSER", "llm")
+RESUME_LOCAL_MIN_CONFIDENCE = float(os.getenv("RESUME_LOCAL_MIN_CONFIDENCE", "0.6"))
+
+
+def set_llm(client):
+    global llm
+    llm = client
+
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+CV_SCAN_PAGES = int(os.getenv("CV_SCAN_PAGES", "3"))
+
+
+def _extract_page_range(args):
+    file_path, start, end = args
+    texts = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page.extract_text() or '')
+            page.close()
+    return texts
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+
+def pdf_pool(workers=PDF_WORKERS):
+    """
+    The process pool shared by every large PDF, created on first use.
+    Workers come from a forkserver (spawn where that is unavailable) so
+    they are never forked from the multithreaded Flask/torch process.
+    Both start methods import the parent's ``__main__`` in every worker
+    (as ``__mp_main__``), so under ``python app.py`` each worker runs the
+    app's module-level setup once when it starts; the pool is kept for the
+    life of the process so that cost is paid only once.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            atexit.register(_pdf_pool.shutdown, wait=False, cancel_futures=True)
+        return _pdf_pool
+
+
+def iter_pdf_pages(file_path, start=0, workers=PDF_WORKERS):
+    """
+    Yields page text in order. Small documents are read page by page with
+    each page's cache released after use; documents with at least
+    PDF_PARALLEL_MIN_PAGES remaining pages are split into page ranges
+    extracted in the shared process pool.
+    """
+    with pdfplumber.open(file_path) as pdf:
+        n_pages = len(pdf.pages)
+        parallel = workers > 1 and n_pages - start >= PDF_PARALLEL_MIN_PAGES
+        if not parallel:
+            for page in pdf.pages[start:]:
+                yield page.extract_text() or ''
+                page.close()
+            return
+
+    chunk = max(1, -(-(n_pages - start) // (workers * 2)))
+    ranges = [(file_path, i, min(i + chunk, n_pages)) for i in range(start, n_pages, chunk)]
+    futures = [pdf_pool(workers).submit(_extract_page_range, r) for r in ranges]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def iter_text(file_path):
     ext = os.path.splitext(file_path)[1].lower()
 
     if ext == ".pdf":
-        with pdfplumber.open(file_path) as pdf:
-            return "\n".join(page.extract_text() or '' for page in pdf.pages)
+        yield from iter_pdf_pages(file_path)
 
     elif ext == ".txt":
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
+            yield f.read()
 
     elif ext == ".docx":
         doc = Document(file_path)
-        return "\n".join(p.text for p in doc.paragraphs)
+        yield "\n".join(p.text for p in doc.paragraphs)
 
     else:
         raise ValueError("Unsupported file type")
 
-def extract_email(text):
-    match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
-    return match.group(0) if match else None
 
-def extract_phone(text):
-    match = re.search(r"(\+?\d{1,3})?[\s\-]?\(?\d{2,4}\)?[\s\-]?\d{3,5}[\s\-]?\d{3,5}", text)
-    return match.group(0) if match else None
+def extract_text(file_path):
+    return "\n".join(iter_text(file_path))
 
 
-def convert_to_date(date_str):
-    try:
-        return datetime.strptime(date_str.strip(), "%b %Y")
-    except:
-        try:
-            return datetime.strptime(date_str.strip(), "%Y")
-        except:
-            return datetime.strptime("Jan " + date_str.strip(), "%b %Y")
-
-def estimate_experience_years(text):
-    years = []
-    matches = re.findall(
-        r'(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)?\.?\s?\d{4})\s*[-–]\s*'
-        r'(\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)?\.?\s?\d{4}|Present)',
-        text, re.IGNORECASE
-    )
+def extract_cv_document(file_path, scan_pages=CV_SCAN_PAGES):
+    """
+    Returns (text, looks_like_cv, fields). PDF fields are extracted page by
+    page as pages stream in and merged, so the CV check and the final
+    fields share one regex pass; if the first ``scan_pages`` pages do not
+    look like a CV the rest of the document is never extracted.
+    Records the ``text_extraction`` and ``regex_extraction`` stages, each
+    without the other's time.
+    """
+    started = time.perf_counter()
+    fields = extract_fields("")
+    regex_seconds = time.perf_counter() - started
 
-    for start, end in matches:
-        try:
-            start_date = convert_to_date(start)
-            end_date = datetime.now() if "present" in end.lower() else convert_to_date(end)
-            diff_years = (end_date - start_date).days / 365
-            if diff_years > 0:
-                years.append(diff_years)
-        except:
-            continue
+    def add_fields(fields, text):
+        nonlocal regex_seconds
+        t = time.perf_counter()
+        fields = merge_fields(fields, extract_fields(text))
+        regex_seconds += time.perf_counter() - t
+        return fields
 
-    return round(sum(years), 1) if years else 0
+    ext = os.path.splitext(file_path)[1].lower()
+    pages = []
+    is_cv = False
+    if ext != ".pdf":
+        pages.append(extract_text(file_path))
+        fields = add_fields(fields, pages[0])
+        is_cv = looks_like_cv(fields)
+    else:
+        for page_text in iter_pdf_pages(file_path, workers=1):
+            pages.append(page_text)
+            fields = add_fields(fields, page_text)
+            if looks_like_cv(fields):
+                is_cv = True
+                break
+            if len(pages) >= scan_pages:
+                break
 
-def is_likely_cv(text):
-    text_lower = text.lower()
+        if is_cv:
+            for page_text in iter_pdf_pages(file_path, start=len(pages)):
+                pages.append(page_text)
+                fields = add_fields(fields, page_text)
 
-    cv_keywords = [
-        "experience", "education", "skills", "projects",
-        "work experience", "professional experience",
-        "certifications", "resume", "cv", "profile"
-    ]
+    record("text_extraction", time.perf_counter() - started - regex_seconds)
+    record("regex_extraction", regex_seconds)
+    return "\n".join(pages), is_cv, fields
 
-    keyword_score = sum(1 for k in cv_keywords if k in text_lower)
-    has_email = extract_email(text_lower) is not None
-    has_phone = extract_phone(text_lower) is not None
 
-    return keyword_score >= 2 and (has_email or has_phone)
+def extract_cv_text(file_path, scan_pages=CV_SCAN_PAGES):
+    """Returns (text, looks_like_cv); see extract_cv_document."""
+    text, is_cv, _ = extract_cv_document(file_path, scan_pages)
+    return text, is_cv
 
+def extract_email(text):
+    match = EMAIL_PATTERN.search(text)
+    return match.group(0) if match else None
 
-def analyze_with_gemini(text):
-    prompt = f"""
-You are a professional resume parser.
-Extract only these fields and return valid JSON (no explanation, no markdown):
+def extract_phone(text):
+    match = PHONE_PATTERN.search(text)
+    return match.group(0) if match else None
+
+
+def estimate_experience_years(text, fields=None):
+    fields = fields or extract_fields(text)
+    return fields["experience_years"]
+
+def is_likely_cv(text, fields=None):
+    fields = fields or extract_fields(text, with_dates=False)
+    return looks_like_cv(fields)
+
+
+RESUME_BATCH_TOKEN_BUDGET = int(os.getenv("RESUME_BATCH_TOKEN_BUDGET", "24000"))
+RESUME_BATCH_MAX_ITEMS = int(os.getenv("RESUME_BATCH_MAX_ITEMS", "10"))
+RESUME_BATCH_RETRIES = int(os.getenv("RESUME_BATCH_RETRIES", "1"))
+# tokens reserved per resume for the JSON object the model writes back
+RESUME_OUTPUT_TOKENS = 400
 
-{{
+RESUME_SCHEMA = """{
 "summary": "",
 "skills": [],
-"education": {{
+"education": {
     "degree": "",
     "university": "",
     "major": ""
-}},
+},
 "certifications": [],
 "languages": [],
 "location": "",
 "experience_years": ""
-}}
+}"""
 
-Resume Text:
-{text}
-
-Rules:
+RESUME_RULES = """Rules:
 - In "summary", provide a concise professional overview (1-3 sentences) of the candidate.
 - In "skills", extract **programming languages, frameworks, libraries, AI/ML/NLP tools, LLMs, and generative AI technologies**.
 - Include skills like Python, Node.js, React, Django, TensorFlow, PyTorch, NLP, RAG, LLMs, HuggingFace, OpenAI, LangChain, etc.
-- Do NOT include soft skills or conceptual skills like "OOP", "API Design", "Teamwork", "Security", "Documentation", etc.
+- Do NOT include soft skills or conceptual skills like "OOP", "API Design", "Teamwork", "Security", "Documentation", etc."""
+
+
+def resume_prompt(text):
+    return f"""
+You are a professional resume parser.
+Extract only these fields and return valid JSON (no explanation, no markdown):
+
+{RESUME_SCHEMA}
+
+Resume Text:
+{text}
+
+{RESUME_RULES}
 - Return strictly valid JSON only.
 """
 
-    model = genai.GenerativeModel("models/gemini-2.5-flash")
-    response = model.generate_content(prompt)
-    raw_output = response.text.strip()
 
+def batch_resume_prompt(texts):
+    resumes = "\n".join(
+        f"<<<RESUME {i}>>>\n{text}\n<<<END RESUME {i}>>>" for i, text in enumerate(texts)
+    )
+    return f"""
+You are a professional resume parser.
+You will receive {len(texts)} resumes, each between "<<<RESUME n>>>" and "<<<END RESUME n>>>".
+For every resume extract only these fields and return a JSON array with one object per resume,
+in the same order (no explanation, no markdown). Each object must also contain "id": n, the
+number of the resume it was extracted from:
+
+{RESUME_SCHEMA}
+
+Resumes:
+{resumes}
+
+{RESUME_RULES}
+- Return strictly a valid JSON array only.
+"""
+
+
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def plan_batches(texts, token_budget=RESUME_BATCH_TOKEN_BUDGET, max_items=RESUME_BATCH_MAX_ITEMS):
+    """
+    Greedily packs resume indices into batches whose estimated prompt plus
+    response size stays within ``token_budget``. A resume that is too large
+    on its own still gets a batch of one.
+    """
+    overhead = estimate_tokens(batch_resume_prompt([]))
+    batches, batch, used = [], [], overhead
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text) + RESUME_OUTPUT_TOKENS
+        if batch and (used + cost > token_budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch, used = [], overhead
+        batch.append(i)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def is_valid_parse(parsed):
+    return (
+        isinstance(parsed, dict)
+        and isinstance(parsed.get("skills"), list)
+        and isinstance(parsed.get("education", {}), dict)
+    )
+
+
+def parse_batch_output(raw_output, count):
+    """
+    Splits a batch response into ``{position: parsed_json}``. Items that are
+    missing, malformed or carry an unknown id are left out so the caller can
+    retry just those resumes.
+    """
+    match = re.search(r"\[[\s\S]*\]", raw_output)
+    try:
+        items = json.loads(match.group(0) if match else raw_output)
+    except Exception:
+        print("Gemini batch output invalid JSON:\n", raw_output)
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    has_ids = all(isinstance(item, dict) and "id" in item for item in items)
+    if not has_ids and len(items) != count:
+        return {}
+
+    parsed = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        if has_ids:
+            try:
+                position = int(item.pop("id"))
+            except (TypeError, ValueError):
+                continue
+        if 0 <= position < count and is_valid_parse(item):
+            parsed[position] = item
+    return parsed
+
+
+def parse_llm_json(raw_output):
     match = re.search(r"\{[\s\S]*\}", raw_output)
     if match:
         raw_output = match.group(0)
@@ -131,21 +400,69 @@ Rules:
         return {}
 
 
-def analyze_resume_with_gemini(file_path):
-    print("Extracting text...")
-    resume_text = extract_text(file_path)
-    if not is_likely_cv(resume_text):
-        return {
-            "error": "NOT_A_CV",
-            "message": "Uploaded file is not a valid CV"
-        }
+def analyze_with_gemini(text):
+    with timed("llm_call"):
+        raw_output = llm.generate(resume_prompt(text)).strip()
+    return parse_llm_json(raw_output)
 
-    print("Parsing with Gemini...")
-    parsed_json = analyze_with_gemini(resume_text) or {}
 
-    email = extract_email(resume_text)
-    phone = extract_phone(resume_text)
-    exp_years = estimate_experience_years(resume_text)
+def analyze_batch_with_gemini(texts, token_budget=RESUME_BATCH_TOKEN_BUDGET,
+                              max_items=RESUME_BATCH_MAX_ITEMS, retries=RESUME_BATCH_RETRIES):
+    """
+    Parses several resume texts with as few LLM requests as the token budget
+    allows. Resumes whose part of a response fails validation are re-batched
+    and retried up to ``retries`` times; anything still failing comes back as
+    ``{}``, like a failed single parse.
+    """
+    results = [{} for _ in texts]
+    pending = list(range(len(texts)))
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        failed = []
+        for batch in plan_batches([texts[i] for i in pending], token_budget, max_items):
+            ids = [pending[j] for j in batch]
+            try:
+                if len(ids) == 1:
+                    parsed = analyze_with_gemini(texts[ids[0]])
+                    parsed = {0: parsed} if is_valid_parse(parsed) else {}
+                else:
+                    with timed("llm_call"):
+                        raw_output = llm.generate(batch_resume_prompt([texts[i] for i in ids])).strip()
+                    parsed = parse_batch_output(raw_output, len(ids))
+            except Exception as e:
+                print(f"Error in batch parse: {str(e)}")
+                parsed = {}
+            for position, i in enumerate(ids):
+                if position in parsed:
+                    results[i] = parsed[position]
+                else:
+                    failed.append(i)
+        pending = failed
+    return results
+
+
+def parse_locally(resume_text, fields, mode=None):
+    """
+    Returns the local parse when the parser mode accepts it, else None so
+    the caller goes to the LLM.
+    """
+    mode = mode or RESUME_PARSER
+    if mode not in ("local", "local-first"):
+        return None
+    with timed("local_parse"):
+        parsed_json, confidence = parse_resume_locally(resume_text, fields)
+    if mode == "local" or confidence >= RESUME_LOCAL_MIN_CONFIDENCE:
+        return parsed_json
+    print(f"Local parse confidence {confidence} too low, falling back to Gemini")
+    return None
+
+
+def build_resume_result(parsed_json, resume_text, fields=None, parser="llm"):
+    fields = fields or extract_fields(resume_text)
+    email = fields["email"]
+    phone = fields["phone"]
+    exp_years = fields["experience_years"]
 
     return {
         "parser_output": {
@@ -163,5 +480,111 @@ def analyze_resume_with_gemini(file_path):
         },
         "email": email,
         "phone": phone,
-        "estimated_experience_years": exp_years
+        "estimated_experience_years": exp_years,
+        "parser": parser
     }
+
+
+NOT_A_CV_RESULT = {
+    "error": "NOT_A_CV",
+    "message": "Uploaded file is not a valid CV"
+}
+
+
+def prepare_resume(file_path, cache):
+    """
+    Runs everything before the LLM call. Returns ``(result, None)`` when the
+    answer is already known (cache hit or not a CV) and otherwise
+    ``(None, (resume_text, cache_keys, fields))``.
+    """
+    file_hash = None
+    if cache is not None:
+        file_hash = sha256_file(file_path)
+        cached = cache.get("file", file_hash)
+        if cached is not None:
+            return cached, None
+
+    print("Extracting text...")
+    resume_text, looks_like_cv, fields = extract_cv_document(file_path)
+
+    text_hash = None
+    if cache is not None:
+        text_hash = sha256_text(resume_text)
+        cached = cache.get("text", text_hash)
+        if cached is not None:
+            cache.put([("file", file_hash)], cached)
+            return cached, None
+        cache.record_miss()
+
+    keys = [("file", file_hash), ("text", text_hash)]
+    if not looks_like_cv:
+        if cache is not None:
+            cache.put(keys, NOT_A_CV_RESULT)
+        return dict(NOT_A_CV_RESULT), None
+    return None, (resume_text, keys, fields)
+
+
+def analyze_resume_with_gemini(file_path, use_cache=True):
+    cache = resume_cache if use_cache else None
+    result, pending = prepare_resume(file_path, cache)
+    if pending is None:
+        return result
+    resume_text, keys, fields = pending
+
+    parsed_json = parse_locally(resume_text, fields)
+    if parsed_json is not None:
+        # local parses are cheap, keep the cache for LLM results
+        return build_resume_result(parsed_json, resume_text, fields, parser="local")
+
+    print("Parsing with Gemini...")
+    llm_started = time.perf_counter()
+    parsed_json = analyze_with_gemini(resume_text) or {}
+    llm_seconds = time.perf_counter() - llm_started
+
+    result = build_resume_result(parsed_json, resume_text, fields)
+
+    # an empty parse means the LLM call failed; retry it next time
+    if cache is not None and parsed_json:
+        cache.put(keys, result, llm_seconds)
+    return result
+
+
+def analyze_resumes_with_gemini(file_paths, use_cache=True, token_budget=RESUME_BATCH_TOKEN_BUDGET):
+    """
+    Bulk version of analyze_resume_with_gemini for folder imports: cache
+    lookups and extraction run per file, then every resume that still needs
+    the LLM is parsed through analyze_batch_with_gemini. Results keep the
+    order of ``file_paths``.
+    """
+    cache = resume_cache if use_cache else None
+    results = [None] * len(file_paths)
+    pending = []
+    for i, file_path in enumerate(file_paths):
+        try:
+            results[i], prepared = prepare_resume(file_path, cache)
+        except Exception as e:
+            print(f"Error preparing {file_path}: {str(e)}")
+            results[i], prepared = {"error": "EXTRACTION_FAILED", "message": str(e)}, None
+        if prepared is None:
+            continue
+        resume_text, keys, fields = prepared
+        parsed_json = parse_locally(resume_text, fields)
+        if parsed_json is None:
+            pending.append((i, resume_text, keys, fields))
+        else:
+            results[i] = build_resume_result(parsed_json, resume_text, fields, parser="local")
+
+    if not pending:
+        return results
+
+    print(f"Parsing {len(pending)} resumes with Gemini in batches...")
+    texts = [resume_text for _, resume_text, _, _ in pending]
+    llm_started = time.perf_counter()
+    parsed = analyze_batch_with_gemini(texts, token_budget=token_budget)
+    llm_seconds = (time.perf_counter() - llm_started) / len(pending)
+
+    for (i, resume_text, keys, fields), parsed_json in zip(pending, parsed):
+        results[i] = build_resume_result(parsed_json, resume_text, fields)
+        if cache is not None and parsed_json:
+            cache.put(keys, results[i], llm_seconds)
+    return results
@@ -0,0 +1,111 @@
+import re
+from datetime import datetime
+
+
+CV_KEYWORDS = [
+    "experience", "education", "skills", "projects",
+    "work experience", "professional experience",
+    "certifications", "resume", "cv", "profile"
+]
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12
+}
+
+_MONTH = r"Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec"
+_EMAIL = r"[\w\.-]+@[\w\.-]+\.\w+"
+_PHONE = r"(?:\+?\d{1,3})?[\s\-]?\(?\d{2,4}\)?[\s\-]?\d{3,5}[\s\-]?\d{3,5}"
+
+
+def _date(prefix):
+    return (
+        rf"\b(?P<{prefix}_month>{_MONTH})?(?P<{prefix}_dot>\.)?"
+        rf"(?P<{prefix}_space>\s)?(?P<{prefix}_year>\d{{4}})"
+    )
+
+
+_RANGE = rf"{_date('start')}\s*[-–]\s*(?:{_date('end')}|(?P<present>Present))"
+
+EMAIL_PATTERN = re.compile(_EMAIL)
+PHONE_PATTERN = re.compile(_PHONE)
+DATE_RANGE_PATTERN = re.compile(_RANGE, re.IGNORECASE)
+
+
+def parse_date(match, prefix):
+    """
+    Mirrors the old strptime chain ("%b %Y", then "%Y") without exceptions:
+    a month must be followed by exactly one space, and a dot is never valid.
+    """
+    month = match.group(f"{prefix}_month")
+    year = int(match.group(f"{prefix}_year"))
+    if match.group(f"{prefix}_dot") or year < 1:
+        return None
+    if month:
+        if not match.group(f"{prefix}_space"):
+            return None
+        return datetime(year, MONTHS[month.lower()], 1)
+    return datetime(year, 1, 1)
+
+
+def cv_keywords(text):
+    text_lower = text.lower()
+    return set(k for k in CV_KEYWORDS if k in text_lower)
+
+
+def date_ranges(text, now=None):
+    now = now or datetime.now()
+    ranges = []
+    for m in DATE_RANGE_PATTERN.finditer(text):
+        start = parse_date(m, "start")
+        end = now if m.group("present") else parse_date(m, "end")
+        if start and end:
+            ranges.append((start, end))
+    return ranges
+
+
+def extract_fields(text, now=None, with_dates=True):
+    """
+    Runs each precompiled pattern over the text once and returns the
+    result every caller shares: first email and phone, CV keywords, date
+    ranges and the experience estimate. ``with_dates=False`` skips the date
+    scan when only the CV check is needed.
+    """
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    fields = {
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0) if phone else None,
+        "keywords": cv_keywords(text),
+        "date_ranges": [],
+        "experience_years": 0,
+    }
+    if with_dates:
+        fields["date_ranges"] = date_ranges(text, now)
+        fields["experience_years"] = experience_years(fields["date_ranges"])
+    return fields
+
+
+def experience_years(ranges):
+    years = [diff for diff in ((end - start).days / 365 for start, end in ranges) if diff > 0]
+    return round(sum(years), 1) if years else 0
+
+
+def merge_fields(fields, more):
+    """
+    Fields of two consecutive chunks of one document (e.g. PDF pages), the
+    same as extract_fields on their concatenation except for a match that
+    would span the boundary.
+    """
+    ranges = fields["date_ranges"] + more["date_ranges"]
+    return {
+        "email": fields["email"] or more["email"],
+        "phone": fields["phone"] or more["phone"],
+        "keywords": fields["keywords"] | more["keywords"],
+        "date_ranges": ranges,
+        "experience_years": experience_years(ranges),
+    }
+
+
+def looks_like_cv(fields):
+    return len(fields["keywords"]) >= 2 and (fields["email"] is not None or fields["phone"] is not None)
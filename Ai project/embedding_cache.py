@@ -0,0 +1,158 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import joblib
+import numpy as np
+import torch
+from metrics import record, ENCODE_SECONDS, ENCODE_BATCH_SIZE, ENCODE_TOKENS
+from model_registry import backend_suffix
+
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "50000"))
+EMBEDDING_CACHE_MAX_TEXT = int(os.getenv("EMBEDDING_CACHE_MAX_TEXT", "256"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")
+# encode() does not expose token lengths, so only every Nth miss batch is re-tokenized for the metric
+ENCODE_TOKENS_SAMPLE_EVERY = int(os.getenv("ENCODE_TOKENS_SAMPLE_EVERY", "20"))
+
+
+def normalize_text(text):
+    return " ".join(str(text).split()).lower()
+
+
+def count_tokens(model, texts):
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return sum(len(t.split()) for t in texts)
+    return sum(len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"])
+
+
+class CachedEncoder:
+    """
+    Wraps a SentenceTransformer so that every normalized string is encoded
+    at most once while it stays in a bounded LRU cache. Texts longer than
+    ``max_text_length`` (descriptions, whole resumes) bypass the cache.
+    Accepts the same ``encode`` arguments the app uses on the raw model.
+    """
+
+    def __init__(self, model, maxsize=EMBEDDING_CACHE_SIZE,
+                 max_text_length=EMBEDDING_CACHE_MAX_TEXT, warm_start_path=None, name="model"):
+        self.model = model
+        self.name = name
+        self.maxsize = maxsize
+        self.max_text_length = max_text_length
+        self.warm_start_path = warm_start_path
+        self.hits = 0
+        self.misses = 0
+        self._miss_batches = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if warm_start_path:
+            self.load(warm_start_path)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _lookup(self, keys):
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vector
+        return found
+
+    def _store(self, items):
+        with self._lock:
+            for key, vector in items:
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def encode(self, sentences, convert_to_tensor=False, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        keys = [normalize_text(t) for t in texts]
+        kwargs.setdefault("show_progress_bar", False)
+
+        cacheable = set(k for k in keys if len(k) <= self.max_text_length)
+        vectors = self._lookup(cacheable)
+        with self._lock:
+            self.hits += sum(1 for k in keys if k in vectors)
+
+        missing = list(dict.fromkeys(k for k in keys if k not in vectors))
+        if missing:
+            started = time.perf_counter()
+            encoded = np.asarray(self.model.encode(missing, convert_to_numpy=True, **kwargs))
+            self._observe(missing, time.perf_counter() - started)
+            if encoded.ndim == 1:
+                encoded = encoded[None, :]
+            fresh = dict(zip(missing, encoded))
+            vectors.update(fresh)
+            self._store((k, v) for k, v in fresh.items() if k in cacheable)
+            with self._lock:
+                self.misses += len(missing)
+
+        if texts:
+            out = np.stack([vectors[k] for k in keys])
+        else:
+            out = np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        if single:
+            out = out[0]
+        if convert_to_tensor:
+            return torch.from_numpy(out)
+        return out
+
+    def _observe(self, texts, seconds):
+        record("encode", seconds)
+        ENCODE_SECONDS.observe(seconds, model=self.name)
+        ENCODE_BATCH_SIZE.observe(len(texts), model=self.name)
+        with self._lock:
+            sample = ENCODE_TOKENS_SAMPLE_EVERY > 0 and self._miss_batches % ENCODE_TOKENS_SAMPLE_EVERY == 0
+            self._miss_batches += 1
+        if sample:
+            ENCODE_TOKENS.observe(count_tokens(self.model, texts), model=self.name)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+        }
+
+    def load(self, path):
+        if not os.path.exists(path):
+            return
+        try:
+            data = joblib.load(path)
+        except Exception as e:
+            print(f"Embedding cache warm start failed: {e}")
+            return
+        self._store(zip(data["keys"], data["vectors"]))
+
+    def save(self, path=None):
+        path = path or self.warm_start_path
+        if not path:
+            return
+        with self._lock:
+            keys = list(self._cache)
+            vectors = np.stack([self._cache[k] for k in keys]) if keys else np.zeros((0, 0))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        joblib.dump({"keys": keys, "vectors": vectors}, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def cached_encoder(model, name):
+    warm_start_path = (
+        os.path.join(EMBEDDING_CACHE_DIR, f"{name}{backend_suffix()}.pkl") if EMBEDDING_CACHE_DIR else None
+    )
+    return CachedEncoder(model, warm_start_path=warm_start_path, name=name)
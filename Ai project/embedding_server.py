@@ -0,0 +1,150 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+import torch
+from metrics import record, FORWARD_BATCH_SIZE
+from model_registry import registry, model_path, LazyModel, EMBEDDING_BACKEND
+from encoder_backends import load_sentence_transformer
+
+
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "64"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "2"))
+
+# arguments that only change how results are returned, not the forward pass
+_OUTPUT_KWARGS = ("convert_to_numpy", "convert_to_tensor", "show_progress_bar")
+
+
+class _Request:
+    def __init__(self, texts, kwargs):
+        self.texts = texts
+        self.kwargs = kwargs
+        self.key = tuple(sorted(kwargs.items()))
+        self.future = Future()
+
+
+class EmbeddingServer:
+    """
+    Owns one SentenceTransformer and serves encode calls from many threads.
+    Requests arriving within ``max_wait_ms`` of each other are merged into
+    one forward pass of up to ``max_batch_size`` texts on a single worker
+    thread; callers block on a future for their slice of the result.
+    Requests larger than a batch are split into full batches on the same
+    queue, so the model is only ever called from the worker.
+    """
+
+    def __init__(self, model, name="model", max_batch_size=EMBED_MAX_BATCH_SIZE, max_wait_ms=EMBED_MAX_WAIT_MS):
+        self.model = model
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.forward_passes = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._pending = None
+        self._worker = threading.Thread(target=self._run, name=f"embed-{name}", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def encode(self, sentences, convert_to_tensor=False, convert_to_numpy=True, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        kwargs = {k: v for k, v in kwargs.items() if k not in _OUTPUT_KWARGS}
+
+        if not texts:
+            out = np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        else:
+            # large requests are queued as full batches so only the worker touches the model
+            requests = [
+                _Request(texts[i:i + self.max_batch_size], kwargs)
+                for i in range(0, len(texts), self.max_batch_size)
+            ]
+            for request in requests:
+                self._queue.put(request)
+            out = np.concatenate([request.future.result() for request in requests])
+
+        if single:
+            out = out[0]
+        if convert_to_tensor:
+            return torch.from_numpy(out)
+        return out
+
+    def _forward(self, texts, kwargs):
+        started = time.perf_counter()
+        out = np.asarray(self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False, **kwargs))
+        if out.ndim == 1:
+            out = out[None, :]
+        record("encode_forward", time.perf_counter() - started)
+        FORWARD_BATCH_SIZE.observe(len(texts), model=self.name)
+        self.forward_passes += 1
+        return out
+
+    def _collect(self):
+        # a request that did not fit the previous batch starts this one
+        batch = [self._pending or self._queue.get()]
+        self._pending = None
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch_size:
+                self._pending = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            self.requests += len(batch)
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.key, []).append(request)
+            for requests in groups.values():
+                texts = [text for request in requests for text in request.texts]
+                try:
+                    out = self._forward(texts, requests[0].kwargs)
+                except Exception as e:
+                    for request in requests:
+                        request.future.set_exception(e)
+                    continue
+                offset = 0
+                for request in requests:
+                    request.future.set_result(out[offset:offset + len(request.texts)])
+                    offset += len(request.texts)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "forward_passes": self.forward_passes,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def embedding_server(name):
+    """
+    Returns the process-wide server for model ``name``. The model itself is
+    registered lazily and only loaded on the first encode (or warm-up),
+    with the backend picked by EMBEDDING_BACKEND.
+    """
+    with _servers_lock:
+        server = _servers.get(name)
+        if server is None:
+            path = model_path(name)
+            registry.register(name, lambda: load_sentence_transformer(path, EMBEDDING_BACKEND))
+            server = _servers[name] = EmbeddingServer(LazyModel(name), name)
+        return server
@@ -1,8 +1,8 @@
-from sentence_transformers import SentenceTransformer
+from embedding_server import embedding_server
 import numpy as np
 
-model = SentenceTransformer(r'D:\multi-qa-mpnet-base-dot-v1')
-# model = SentenceTransformer(r'F:\model\multi-qa-mpnet-base-dot-v1')
+# shared with app.py; loaded on first use from the path in model_registry
+model = embedding_server("multi-qa-mpnet-base-dot-v1")
 
 def compute_embedding(texts):
 
@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+from model_registry import model_path, EMBEDDING_BACKEND
+
+EMBEDDING_BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+# written by `python encoder_backends.py export`; avx2 / arm64 for older or ARM hosts
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx512_vnni")
+EMBEDDING_PARITY_MIN_COSINE = float(os.getenv("EMBEDDING_PARITY_MIN_COSINE", "0.98"))
+
+
+def load_sentence_transformer(path, backend=EMBEDDING_BACKEND):
+    """
+    Loads a SentenceTransformer for CPU inference with the given backend:
+
+    - "torch": fp32 PyTorch, as before
+    - "int8": fp32 weights with every Linear layer dynamically quantized to int8
+    - "onnx": ONNX Runtime, exported on first load if the model has no onnx/ folder
+    - "onnx-int8": ONNX Runtime with the int8 file written by ``export``
+    """
+    if backend == "torch":
+        return SentenceTransformer(path)
+    if backend == "int8":
+        model = SentenceTransformer(path, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(path, backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(
+            path, backend="onnx",
+            model_kwargs={"file_name": f"onnx/model_qint8_{EMBEDDING_ONNX_QUANTIZATION}.onnx"}
+        )
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}, expected one of {EMBEDDING_BACKENDS}")
+
+
+def export_quantized_onnx(path, quantization=EMBEDDING_ONNX_QUANTIZATION):
+    """Writes onnx/model_qint8_<quantization>.onnx next to the model at ``path``."""
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(path, backend="onnx")
+    export_dynamic_quantized_onnx_model(model, quantization, path)
+
+
+def skill_vocabulary(extra_path=None):
+    from local_parser import SKILLS
+
+    vocabulary = set(SKILLS)
+    for aliases in SKILLS.values():
+        vocabulary.update(aliases)
+    if extra_path:
+        with open(extra_path, encoding="utf-8") as f:
+            vocabulary.update(line.strip() for line in f if line.strip())
+    return sorted(vocabulary)
+
+
+def _normalize(embs):
+    embs = np.asarray(embs, dtype=np.float32)
+    return embs / np.maximum(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12)
+
+
+def cosine_drift(reference, candidate):
+    """
+    Compares two embedding matrices of the same texts: per-text cosine
+    between the fp32 and backend vectors, and how often each text keeps the
+    same nearest neighbour inside the vocabulary.
+    """
+    reference, candidate = _normalize(reference), _normalize(candidate)
+    cosines = np.sum(reference * candidate, axis=1)
+
+    ref_sim = reference @ reference.T
+    cand_sim = candidate @ candidate.T
+    np.fill_diagonal(ref_sim, -np.inf)
+    np.fill_diagonal(cand_sim, -np.inf)
+    same_neighbour = np.argmax(ref_sim, axis=1) == np.argmax(cand_sim, axis=1)
+
+    return {
+        "texts": int(len(cosines)),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine": round(float(cosines.min()), 5),
+        "p01_cosine": round(float(np.percentile(cosines, 1)), 5),
+        "nearest_neighbour_agreement": round(float(same_neighbour.mean()), 4),
+    }
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _timed_encode(model, texts, repeat):
+    model.encode(texts[:8], convert_to_numpy=True, show_progress_bar=False)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        embs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+    return embs, (time.perf_counter() - started) / repeat
+
+
+def parity_report(name, backend, texts, repeat=3):
+    path = model_path(name)
+
+    rss_before = _rss_mb()
+    reference_model = load_sentence_transformer(path, "torch")
+    rss_reference = _rss_mb()
+    reference, reference_seconds = _timed_encode(reference_model, texts, repeat)
+    del reference_model
+
+    rss_before_candidate = _rss_mb()
+    candidate_model = load_sentence_transformer(path, backend)
+    rss_candidate = _rss_mb()
+    candidate, candidate_seconds = _timed_encode(candidate_model, texts, repeat)
+
+    return {
+        "model": name,
+        "backend": backend,
+        **cosine_drift(reference, candidate),
+        "fp32_encode_seconds": round(reference_seconds, 4),
+        "backend_encode_seconds": round(candidate_seconds, 4),
+        "speedup": round(reference_seconds / candidate_seconds, 2) if candidate_seconds else None,
+        "fp32_model_rss_mb": round(rss_reference - rss_before, 1) if rss_before is not None else None,
+        "backend_model_rss_mb": (
+            round(rss_candidate - rss_before_candidate, 1) if rss_before_candidate is not None else None
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export and check alternative CPU encoder backends.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="write the int8 ONNX file used by EMBEDDING_BACKEND=onnx-int8")
+    export.add_argument("--model", action="append", required=True)
+    export.add_argument("--quantization", default=EMBEDDING_ONNX_QUANTIZATION)
+
+    parity = sub.add_parser("parity", help="cosine drift and speed of a backend against fp32")
+    parity.add_argument("--model", action="append", required=True)
+    parity.add_argument("--backend", choices=EMBEDDING_BACKENDS[1:], default="int8")
+    parity.add_argument("--vocab", default=None, help="extra skills file, one per line")
+    parity.add_argument("--repeat", type=int, default=3)
+    parity.add_argument("--min-cosine", type=float, default=EMBEDDING_PARITY_MIN_COSINE)
+    parity.add_argument("--output", default=None)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        for name in args.model:
+            export_quantized_onnx(model_path(name), args.quantization)
+            print(f"Exported int8 ONNX model for {name}")
+        return 0
+
+    texts = skill_vocabulary(args.vocab)
+    reports = [parity_report(name, args.backend, texts, args.repeat) for name in args.model]
+    print(json.dumps(reports, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+    failing = [r["model"] for r in reports if r["min_cosine"] < args.min_cosine]
+    if failing:
+        print(f"Cosine drift above tolerance (min cosine < {args.min_cosine}) for: {', '.join(failing)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from model_registry import backend_suffix
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_INDEX_PATH = os.getenv(
+    "JOB_INDEX_PATH",
+    os.path.join(BASE_DIR, "jobIndex", f"job_embeddings{backend_suffix()}.sqlite3")
+)
+
+
+def job_key(job_id):
+    return str(job_id)
+
+
+def job_skill_list(job):
+    return sorted(set(s.lower() for s in job.get("requiredSkills") or []))
+
+
+def job_text(job):
+    return f"{job.get('title', '')} {job.get('description', '')} {' '.join(job.get('requiredSkills') or [])}"
+
+
+def job_hash(job):
+    content = json.dumps(
+        [job.get("title", ""), job.get("description", ""), job.get("requiredSkills") or []],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class JobEmbeddingIndex:
+    """
+    Job embeddings keyed by job id and content hash, kept in memory and
+    persisted one SQLite row per job. Only jobs that are new or whose
+    title/description/skills changed are sent to the encoder, and only
+    their rows are written; encoding and writing happen outside the lock
+    that readers take. An optional ``retriever`` is kept in sync with the
+    stored text vectors.
+    """
+
+    def __init__(self, model, path=JOB_INDEX_PATH, retriever=None):
+        self.model = model
+        self.path = path
+        self.retriever = retriever
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        if path:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " hash TEXT NOT NULL,"
+                " skills TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " skill_embs BLOB NOT NULL,"
+                " text_emb BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        self.load()
+        self._add_to_retriever(self.entries)
+
+    def load(self):
+        if self._conn is None:
+            return
+        try:
+            rows = self._conn.execute(
+                "SELECT key, hash, skills, dim, skill_embs, text_emb FROM job_embeddings"
+            ).fetchall()
+        except sqlite3.DatabaseError as e:
+            print(f"Job index could not be loaded, rebuilding: {e}")
+            return
+        for key, content_hash, skills, dim, skill_embs, text_emb in rows:
+            skills = json.loads(skills)
+            self.entries[key] = {
+                "hash": content_hash,
+                "skills": skills,
+                "skill_embs": np.frombuffer(skill_embs, dtype=np.float32).reshape(len(skills), dim),
+                "text_emb": np.frombuffer(text_emb, dtype=np.float32),
+            }
+
+    def _write(self, entries):
+        if self._conn is None or not entries:
+            return
+        rows = [
+            (
+                key, entry["hash"], json.dumps(entry["skills"], ensure_ascii=False), len(entry["text_emb"]),
+                np.ascontiguousarray(entry["skill_embs"], dtype=np.float32).tobytes(),
+                np.ascontiguousarray(entry["text_emb"], dtype=np.float32).tobytes(),
+            )
+            for key, entry in entries.items()
+        ]
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_embeddings (key, hash, skills, dim, skill_embs, text_emb)"
+                " VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def _delete(self, keys):
+        if self._conn is None or not keys:
+            return
+        with self._db_lock:
+            self._conn.executemany("DELETE FROM job_embeddings WHERE key = ?", [(k,) for k in keys])
+            self._conn.commit()
+
+    def _add_to_retriever(self, entries):
+        if self.retriever is not None and entries:
+            keys = list(entries)
+            self.retriever.add(keys, np.stack([entries[k]["text_emb"] for k in keys]))
+
+    def _encode(self, texts):
+        return np.asarray(
+            self.model.encode(texts, convert_to_numpy=True, show_progress_bar=False),
+            dtype=np.float32
+        )
+
+    def _build_entries(self, jobs):
+        skill_union = sorted(set(s for job in jobs for s in job_skill_list(job)))
+        text_embs = self._encode([job_text(job) for job in jobs])
+        dim = text_embs.shape[1]
+
+        skill_vectors = {}
+        if skill_union:
+            skill_vectors = dict(zip(skill_union, self._encode(skill_union)))
+
+        entries = {}
+        for job, text_emb in zip(jobs, text_embs):
+            skills = job_skill_list(job)
+            skill_embs = (
+                np.stack([skill_vectors[s] for s in skills])
+                if skills else np.zeros((0, dim), dtype=np.float32)
+            )
+            entries[job_key(job["id"])] = {
+                "hash": job_hash(job),
+                "skills": skills,
+                "skill_embs": skill_embs,
+                "text_emb": text_emb,
+            }
+        return entries
+
+    def sync(self, jobs):
+        with self._lock:
+            stale = {}
+            for job in jobs:
+                entry = self.entries.get(job_key(job["id"]))
+                if entry is None or entry["hash"] != job_hash(job):
+                    stale[job_key(job["id"])] = job
+
+        if stale:
+            built = self._build_entries(list(stale.values()))
+            with self._lock:
+                self.entries.update(built)
+                self._add_to_retriever(built)
+            self._write(built)
+
+        with self._lock:
+            return [self.entries[job_key(job["id"])] for job in jobs]
+
+    def remove(self, job_id):
+        with self._lock:
+            removed = self.entries.pop(job_key(job_id), None) is not None
+            if removed and self.retriever is not None:
+                self.retriever.remove([job_key(job_id)])
+        if removed:
+            self._delete([job_key(job_id)])
+        return removed
+
+    def __len__(self):
+        return len(self.entries)
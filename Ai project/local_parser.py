@@ -0,0 +1,363 @@
+import os
+import re
+import json
+from bisect import bisect_right
+from collections import deque
+from cv_fields import extract_fields
+
+
+SKILL_GAZETTEER_PATH = os.getenv("SKILL_GAZETTEER_PATH")
+
+# canonical skill -> every spelling matched in resumes (case-insensitive)
+SKILLS = {
+    "Python": ["python", "python3"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "es6"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "Go": ["golang"],
+    "Rust": ["rust"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "PHP": ["php"],
+    "Ruby": ["ruby"],
+    "Dart": ["dart"],
+    "Scala": ["scala"],
+    "MATLAB": ["matlab"],
+    "SQL": ["sql"],
+    "Bash": ["bash", "shell scripting"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Nest.js": ["nest.js", "nestjs", "nest js"],
+    "Express.js": ["express.js", "expressjs", "express"],
+    "React": ["react", "react.js", "reactjs"],
+    "React Native": ["react native"],
+    "Next.js": ["next.js", "nextjs"],
+    "Angular": ["angular", "angularjs"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "Django": ["django"],
+    "Django REST Framework": ["django rest framework", "drf"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "spring"],
+    "Laravel": ["laravel"],
+    ".NET": [".net", "asp.net", "dotnet"],
+    "Flutter": ["flutter"],
+    "Android": ["android"],
+    "iOS": ["ios"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful api", "restful apis"],
+    "Microservices": ["microservices"],
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "SQLite": ["sqlite"],
+    "Oracle": ["oracle"],
+    "Firebase": ["firebase"],
+    "Elasticsearch": ["elasticsearch"],
+    "TypeORM": ["typeorm"],
+    "Prisma": ["prisma"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Git": ["git"],
+    "GitHub": ["github"],
+    "CI/CD": ["ci/cd"],
+    "Linux": ["linux"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure"],
+    "GCP": ["gcp", "google cloud"],
+    "Kafka": ["kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Machine Learning": ["machine learning"],
+    "Deep Learning": ["deep learning"],
+    "Natural Language Processing (NLP)": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"],
+    "Data Science": ["data science"],
+    "Data Analysis": ["data analysis"],
+    "LLMs": ["llm", "llms", "large language models", "large language model"],
+    "RAG": ["rag", "retrieval augmented generation", "retrieval-augmented generation"],
+    "Generative AI": ["generative ai", "genai"],
+    "Prompt Engineering": ["prompt engineering"],
+    "LangChain": ["langchain"],
+    "LlamaIndex": ["llamaindex"],
+    "HuggingFace": ["huggingface", "hugging face"],
+    "Transformers": ["transformers"],
+    "BERT": ["bert"],
+    "AraBERT": ["arabert"],
+    "OpenAI": ["openai"],
+    "TensorFlow": ["tensorflow"],
+    "Keras": ["keras"],
+    "PyTorch": ["pytorch", "torch"],
+    "Scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Matplotlib": ["matplotlib"],
+    "OpenCV": ["opencv"],
+    "YOLO": ["yolo"],
+    "FAISS": ["faiss"],
+    "Spark": ["spark", "pyspark"],
+    "Power BI": ["power bi"],
+    "Tableau": ["tableau"],
+    "Selenium": ["selenium"],
+}
+
+# aliases that are also everyday English words ("express an interest", "a spring
+# internship"); they only count on a skills line or next to another technology
+AMBIGUOUS_ALIASES = {
+    "express", "spring", "swift", "git", "rust", "ruby", "dart", "java", "react", "angular",
+    "flask", "oracle", "azure", "spark", "torch", "rag", "transformers", "tableau", "selenium",
+}
+
+LANGUAGES = [
+    "Arabic", "English", "French", "German", "Spanish", "Turkish", "Russian",
+    "Chinese", "Italian", "Japanese", "Korean", "Persian", "Hindi", "Portuguese", "Dutch",
+]
+
+CITIES = [
+    "Damascus", "Aleppo", "Homs", "Hama", "Latakia", "Tartus", "Daraa", "Idlib",
+    "Deir ez-Zor", "Raqqa", "As-Suwayda", "Beirut", "Amman", "Cairo", "Baghdad",
+    "Riyadh", "Jeddah", "Dubai", "Abu Dhabi", "Doha", "Kuwait", "Istanbul",
+    "Berlin", "London", "Paris",
+]
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile summary", "profile", "about", "about me", "objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment"],
+    "education": ["education", "academic background"],
+    "skills": ["skills", "technical skills", "core skills"],
+    "projects": ["projects", "personal projects"],
+    "certifications": ["certifications", "certificates", "courses", "licenses & certifications"],
+    "languages": ["languages"],
+}
+
+_HEADING = {alias: section for section, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+DEGREE_PATTERN = re.compile(
+    r"\b(?:bachelor(?:['’]?s)?|b\.?\s?sc|b\.?\s?eng|master(?:['’]?s)?|m\.?\s?sc|m\.?\s?eng|"
+    r"ph\.?\s?d|doctorate|diploma)\b[^\n,|;]*",
+    re.IGNORECASE
+)
+UNIVERSITY_PATTERN = re.compile(
+    r"(?:[A-Z][\w'’\-]*[ \t]+)*(?:University|College|Institute)"
+    r"(?:[ \t]+(?:of|for)(?:[ \t]+[A-Z][\w'’\-]*)+)?"
+)
+MAJOR_PATTERN = re.compile(
+    r"\b(?:major|specialization|specializing|field of study)\b\s*(?:[:\-]|\bin\b)?\s*"
+    r"([A-Z][\w&/\-]*(?:\s+(?:and\s+)?[A-Z][\w&/\-]*)*)"
+)
+DEGREE_FIELD_PATTERN = re.compile(r"\b(?:in|of)\s+([A-Z][\w&/\-]*(?:\s+(?:and\s+)?[A-Z][\w&/\-]*)*)")
+LOCATION_PATTERN = re.compile(r"\b(?:location|address|city)[ \t]*:[ \t]*([^|\n]+)", re.IGNORECASE)
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+class AhoCorasick:
+    """
+    Multi-pattern automaton: every phrase is found in a single pass over
+    the text regardless of how many phrases are registered. Matches must sit
+    on word boundaries and overlapping matches resolve leftmost-longest.
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        self.built = False
+
+    def add(self, phrase, value):
+        state = 0
+        for ch in phrase.lower():
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+            state = nxt
+        self.output[state] = (len(phrase), value)
+        self.built = False
+
+    def build(self):
+        # each state also carries every phrase that ends on its fail chain
+        self.matches = [[] for _ in self.goto]
+        queue = deque()
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            own = [self.output[state]] if self.output[state] else []
+            self.matches[state] = own + self.matches[self.fail[state]]
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+        self.built = True
+
+    def find(self, text):
+        if not self.built:
+            self.build()
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(ch.lower()[:1] or ch for ch in text)
+
+        candidates = []
+        goto, fail, matches = self.goto, self.fail, self.matches
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in matches[state]:
+                start = end - length
+                if (start == 0 or not lowered[start - 1].isalnum()) and \
+                        (end == len(lowered) or not lowered[end].isalnum()):
+                    candidates.append((start, end, value))
+
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        found, last_end = [], 0
+        for start, end, value in candidates:
+            if start >= last_end:
+                found.append((start, end, value))
+                last_end = end
+        return found
+
+
+def load_gazetteer(path=SKILL_GAZETTEER_PATH):
+    skills = {name: list(aliases) for name, aliases in SKILLS.items()}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            extra = json.load(f)
+        if isinstance(extra, list):
+            extra = {name: [name.lower()] for name in extra}
+        for name, aliases in extra.items():
+            skills.setdefault(name, []).extend(aliases)
+
+    automaton = AhoCorasick()
+    for name, aliases in skills.items():
+        for alias in aliases:
+            automaton.add(alias, ("skill", name))
+    for language in LANGUAGES:
+        automaton.add(language, ("language", language))
+    for city in CITIES:
+        automaton.add(city, ("location", city))
+    automaton.build()
+    return automaton
+
+
+gazetteer = load_gazetteer()
+
+
+def split_sections(text):
+    sections = {}
+    current = None
+    for line in text.splitlines():
+        heading = line.strip().strip(":").strip().lower()
+        if heading in _HEADING:
+            current = _HEADING[heading]
+            sections.setdefault(current, [])
+            continue
+        line = line.strip().lstrip("•·-*–").strip()
+        if current and line:
+            sections[current].append(line)
+    return sections
+
+
+def skill_lines(text):
+    """
+    Start offset of every line and whether it lists skills: it sits under a
+    skills heading or starts with a label such as "Skills:".
+    """
+    starts, listed = [], []
+    current, offset = None, 0
+    for line in text.splitlines(keepends=True):
+        heading = line.strip().strip(":").strip().lower()
+        label = line.split(":", 1)[0].strip().lower() if ":" in line else None
+        if heading in _HEADING:
+            current = _HEADING[heading]
+        starts.append(offset)
+        listed.append(current == "skills" or _HEADING.get(label) == "skills")
+        offset += len(line)
+    return starts, listed
+
+
+def skill_matches(text, matches):
+    """Gazetteer skill hits, dropping ambiguous aliases found outside a skill context."""
+    starts, listed = skill_lines(text)
+
+    def line_of(start):
+        return bisect_right(starts, start) - 1
+
+    ambiguous = [text[start:end].lower() in AMBIGUOUS_ALIASES for start, end, _ in matches]
+    tech_lines = {
+        line_of(start) for (start, _, (kind, _)), amb in zip(matches, ambiguous) if kind == "skill" and not amb
+    }
+    return [
+        (start, name) for (start, _, (kind, name)), amb in zip(matches, ambiguous)
+        if kind == "skill" and (not amb or listed[line_of(start)] or line_of(start) in tech_lines)
+    ]
+
+
+def parse_education(text, sections):
+    source = "\n".join(sections.get("education", [])) or text
+    degree = DEGREE_PATTERN.search(source)
+    university = UNIVERSITY_PATTERN.search(source)
+    major = MAJOR_PATTERN.search(source) or MAJOR_PATTERN.search(text)
+    if not major and degree:
+        major = DEGREE_FIELD_PATTERN.search(degree.group(0))
+    return {
+        "degree": degree.group(0).strip(" -–:") if degree else "",
+        "university": university.group(0).strip() if university else "",
+        "major": major.group(1).strip() if major else "",
+    }
+
+
+def local_confidence(parsed, fields):
+    score = 0.4 * min(len(parsed["skills"]), 5) / 5
+    score += 0.2 if parsed["education"]["degree"] else 0
+    score += 0.1 if parsed["education"]["university"] else 0
+    score += 0.1 if fields["email"] or fields["phone"] else 0
+    score += 0.1 if fields["experience_years"] else 0
+    score += 0.1 if parsed["summary"] else 0
+    return round(score, 2)
+
+
+def parse_resume_locally(text, fields=None):
+    """
+    Network-free resume parser producing the same fields as the LLM prompt.
+    Skills, languages and cities come from one pass of the gazetteer
+    automaton (ambiguous skill words need a skill context), the rest from section headings and the shared regex
+    extractors. Returns ``(parsed_json, confidence)`` with confidence in 0..1.
+    """
+    fields = fields or extract_fields(text)
+    sections = split_sections(text)
+
+    matches = gazetteer.find(text)
+    found = {"skill": {}, "language": {}, "location": {}}
+    for start, name in skill_matches(text, matches):
+        found["skill"].setdefault(name, start)
+    for start, end, (kind, name) in matches:
+        if kind != "skill":
+            found[kind].setdefault(name, start)
+
+    languages_text = "\n".join(sections.get("languages", []))
+    languages = [name for name in found["language"] if name.lower() in languages_text.lower()]
+
+    location = LOCATION_PATTERN.search(text)
+    summary = " ".join(sections.get("summary", []))
+
+    parsed = {
+        "summary": " ".join(SENTENCE_PATTERN.split(summary)[:3]),
+        "skills": list(found["skill"]),
+        "education": parse_education(text, sections),
+        "certifications": sections.get("certifications", []),
+        "languages": languages,
+        "location": location.group(1).strip() if location else next(iter(found["location"]), ""),
+        "experience_years": fields["experience_years"],
+    }
+    return parsed, local_confidence(parsed, fields)
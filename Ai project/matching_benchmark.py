@@ -0,0 +1,369 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmark", "results")
+BASELINE_PATH = os.path.join(BASE_DIR, "benchmark", "matching_baseline.json")
+
+ENDPOINTS = ["get-similarity", "predict-salary", "predict-acceptance"]
+
+TITLES = [
+    "Backend Developer", "Frontend Developer", "Full Stack Developer", "AI Engineer",
+    "NLP Engineer", "Data Scientist", "Data Analyst", "DevOps Engineer",
+    "Mobile Developer", "Machine Learning Engineer", "QA Engineer", "Software Engineer",
+]
+SKILLS = [
+    "Python", "Node.js", "NestJS", "Django", "Flask", "FastAPI", "React", "Angular",
+    "Vue.js", "TypeScript", "JavaScript", "Java", "Spring Boot", "C#", ".NET", "PHP",
+    "Laravel", "Flutter", "Kotlin", "Swift", "SQL", "PostgreSQL", "MySQL", "MongoDB",
+    "Redis", "Docker", "Kubernetes", "AWS", "Azure", "Git", "Linux", "TensorFlow",
+    "PyTorch", "Scikit-learn", "Pandas", "NumPy", "NLP", "Computer Vision", "LLMs",
+    "RAG", "LangChain", "HuggingFace", "Machine Learning", "Deep Learning", "Power BI",
+]
+EDUCATIONS = [
+    "bachelor of computer science", "bachelor of information engineering",
+    "master of computer science", "master of data science", "phd in artificial intelligence",
+]
+SENTENCES = [
+    "We are looking for an engineer to join our growing team.",
+    "You will design, build and maintain scalable services.",
+    "Experience with cloud infrastructure is a plus.",
+    "You will work closely with product and design.",
+    "Strong problem solving and communication skills are required.",
+    "You will own features end to end from design to production.",
+    "Familiarity with agile practices and code review is expected.",
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the matching endpoints of the AI service.")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--sizes", default="100,1000,10000,50000",
+                        help="job catalogue sizes for /get-similarity")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=50, help="measured requests per scenario")
+    parser.add_argument("--mode", choices=["client", "http", "both"], default="client",
+                        help="Flask test client in-process, real HTTP against --url, or both")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--server-pid", type=int, default=None,
+                        help="pid of the HTTP server, to report its RSS")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="JSON report path (default: benchmark/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--check-baseline", action="store_true",
+                        help="exit with status 1 when a scenario regresses past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative p95 increase / throughput drop before failing")
+    return parser.parse_args(argv)
+
+
+def make_jobs(n, rng):
+    jobs = []
+    for i in range(n):
+        title = rng.choice(TITLES)
+        jobs.append({
+            "id": f"bench-{i}",
+            "title": f"{rng.choice(['Junior', 'Senior', 'Lead', ''])} {title}".strip(),
+            "description": " ".join(rng.sample(SENTENCES, 3)),
+            "requiredSkills": rng.sample(SKILLS, rng.randint(3, 8)),
+            "requiredEducation": rng.sample(EDUCATIONS, rng.randint(1, 2)),
+            "requiredExperience": rng.randint(0, 8),
+        })
+    return jobs
+
+
+def make_candidate(rng):
+    skills = rng.sample(SKILLS, rng.randint(4, 12))
+    years = rng.randint(0, 10)
+    return {
+        "skills": skills,
+        "education": rng.choice(EDUCATIONS),
+        "experience": years,
+        "text": f"{rng.choice(TITLES)} with {years} years of experience in {', '.join(skills)}. "
+                + " ".join(rng.sample(SENTENCES, 2)),
+    }
+
+
+def make_payload(endpoint, candidate, jobs, rng):
+    job = rng.choice(jobs)
+    if endpoint == "get-similarity":
+        return {
+            "resume_text": candidate["text"],
+            "resume_skills": candidate["skills"],
+            "resume_education": [candidate["education"]],
+            "resume_experience": [f"about {candidate['experience']} years"],
+            "jobs": jobs,
+        }
+    if endpoint == "predict-salary":
+        return {
+            "candidate_skills": candidate["skills"],
+            "job_required_skills": job["requiredSkills"],
+            "candidate_education": candidate["education"],
+            "candidate_experience": candidate["experience"],
+            "job_title": job["title"],
+        }
+    return {
+        "candidate_skills": candidate["skills"],
+        "job_required_skills": job["requiredSkills"],
+        "job_title": job["title"],
+        "job_description": job["description"],
+    }
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "mean_ms": round(float(values.mean()), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
+
+
+def rss_mb(pid=None):
+    """Current and peak RSS of ``pid`` (default: this process) in MB."""
+    status_path = f"/proc/{pid or 'self'}/status"
+    if os.path.exists(status_path):
+        fields = {}
+        with open(status_path) as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    fields[key] = round(int(value.split()[0]) / 1024, 1)
+        return {"rss_mb": fields.get("VmRSS"), "peak_rss_mb": fields.get("VmHWM")}
+    if pid is None and resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+        return {"rss_mb": None, "peak_rss_mb": round(peak, 1)}
+    return {"rss_mb": None, "peak_rss_mb": None}
+
+
+class EncodeCounter:
+    """Counts forward passes and sentences reaching the underlying SentenceTransformers."""
+
+    def __init__(self, encoders):
+        self.calls = 0
+        self.sentences = 0
+        self._lock = threading.Lock()
+        for encoder in encoders:
+            # unwrap the cache and the batching server down to the SentenceTransformer
+            model = encoder
+            while "model" in vars(model):
+                model = model.model
+            model.encode = self._wrap(model.encode)
+
+    def _wrap(self, encode):
+        def counted(sentences, *args, **kwargs):
+            with self._lock:
+                self.calls += 1
+                self.sentences += 1 if isinstance(sentences, str) else len(sentences)
+            return encode(sentences, *args, **kwargs)
+        return counted
+
+    def snapshot(self):
+        with self._lock:
+            return self.calls, self.sentences
+
+
+class ClientDriver:
+    mode = "client"
+
+    def __init__(self):
+        os.environ.setdefault("JOB_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "job_embeddings.sqlite3"))
+        # imported here so the synthetic catalogue never touches the real job index
+        import app
+        self.app = app.app
+        self.counter = EncodeCounter([app.embedder, app.modelembe])
+        self._local = threading.local()
+
+    def post(self, endpoint, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(f"/{endpoint}", json=payload)
+        return response.status_code
+
+    def rss(self):
+        return rss_mb()
+
+
+class HttpDriver:
+    mode = "http"
+    counter = None
+
+    def __init__(self, url, server_pid=None):
+        self.url = url.rstrip("/")
+        self.server_pid = server_pid
+
+    def post(self, endpoint, payload):
+        request = urllib.request.Request(
+            f"{self.url}/{endpoint}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def rss(self):
+        return rss_mb(self.server_pid) if self.server_pid else {"rss_mb": None, "peak_rss_mb": None}
+
+
+def run_scenario(driver, endpoint, jobs, concurrency, n_requests, rng):
+    payloads = [make_payload(endpoint, make_candidate(rng), jobs, rng) for _ in range(n_requests)]
+
+    # first request syncs the job index for this catalogue; report it separately
+    started = time.perf_counter()
+    driver.post(endpoint, payloads[0])
+    warmup_seconds = time.perf_counter() - started
+
+    before = driver.counter.snapshot() if driver.counter else None
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def task(payload):
+        nonlocal errors
+        t = time.perf_counter()
+        status = driver.post(endpoint, payload)
+        elapsed = time.perf_counter() - t
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(task, payloads))
+    wall_seconds = time.perf_counter() - started
+
+    result = {
+        "endpoint": endpoint,
+        "mode": driver.mode,
+        "jobs": len(jobs) if endpoint == "get-similarity" else None,
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": errors,
+        "warmup_ms": round(warmup_seconds * 1000, 2),
+        "requests_per_s": round(n_requests / wall_seconds, 2),
+        **percentiles(latencies),
+        **driver.rss(),
+    }
+    if driver.counter:
+        calls, sentences = driver.counter.snapshot()
+        result["encoder_calls_per_request"] = round((calls - before[0]) / n_requests, 2)
+        result["encoded_sentences_per_request"] = round((sentences - before[1]) / n_requests, 2)
+    return result
+
+
+def scenario_key(result):
+    return f"{result['endpoint']}|{result['mode']}|{result['jobs'] or '-'}|{result['concurrency']}"
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    previous = {scenario_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = previous.get(scenario_key(result))
+        if not base:
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{scenario_key(result)}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if result["requests_per_s"] < base["requests_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{scenario_key(result)}: throughput {base['requests_per_s']} -> {result['requests_per_s']} req/s"
+            )
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    sizes = [int(s) for s in args.sizes.split(",")]
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    drivers = []
+    if args.mode in ("client", "both"):
+        drivers.append(ClientDriver())
+    if args.mode in ("http", "both"):
+        drivers.append(HttpDriver(args.url, args.server_pid))
+
+    results = []
+    for driver in drivers:
+        for endpoint in endpoints:
+            # salary and acceptance score one job per request; a small pool is enough
+            for size in (sizes if endpoint == "get-similarity" else [200]):
+                jobs = make_jobs(size, rng)
+                for concurrency in levels:
+                    result = run_scenario(driver, endpoint, jobs, concurrency, args.requests, rng)
+                    results.append(result)
+                    print(f"{scenario_key(result):<40} p50 {result['p50_ms']:>9} p95 {result['p95_ms']:>9} "
+                          f"p99 {result['p99_ms']:>9} ms  {result['requests_per_s']:>8} req/s"
+                          + (f"  {result['encoder_calls_per_request']} encode/req"
+                             if "encoder_calls_per_request" in result else ""))
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "endpoints": endpoints,
+            "sizes": sizes,
+            "concurrency": levels,
+            "requests": args.requests,
+            "mode": args.mode,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"matching_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.check_baseline:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPerformance regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
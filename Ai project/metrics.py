@@ -0,0 +1,132 @@
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "off") == "on"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Minimal Prometheus histogram: cumulative buckets plus sum and count for
+    every combination of label values.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(s["counts"]), s["sum"], s["count"]) for key, s in self._series.items()}
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = ",".join(labels + [f'le="{_format_number(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{le}}} {cumulative}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines)
+
+
+REGISTRY = []
+
+STAGE_SECONDS = Histogram(
+    "irshad_stage_duration_seconds", "Time spent in each hot-path stage.", ["stage"]
+)
+ENCODE_SECONDS = Histogram(
+    "irshad_encode_duration_seconds", "Time spent in SentenceTransformer encode calls.", ["model"]
+)
+ENCODE_BATCH_SIZE = Histogram(
+    "irshad_encode_batch_size", "Texts sent to the model per encode call.", ["model"], BATCH_BUCKETS
+)
+ENCODE_TOKENS = Histogram(
+    "irshad_encode_tokens", "Tokens sent to the model per sampled encode call.", ["model"], TOKEN_BUCKETS
+)
+FORWARD_BATCH_SIZE = Histogram(
+    "irshad_embedding_forward_batch_size", "Texts per micro-batched forward pass.", ["model"], BATCH_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "irshad_http_request_duration_seconds", "HTTP request latency.", ["endpoint", "method", "status"]
+)
+
+# stage timings of the request running in the current context, None outside requests
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+def record(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def start_request():
+    _request_timings.set([])
+
+
+def finish_request():
+    timings = _request_timings.get() or []
+    _request_timings.set(None)
+    return timings
+
+
+def server_timing_header(timings):
+    totals = {}
+    for stage, seconds in timings:
+        total, count = totals.get(stage, (0.0, 0))
+        totals[stage] = (total + seconds, count + 1)
+    return ", ".join(
+        f'{stage};dur={total * 1000:.2f};desc="{count}x"' for stage, (total, count) in totals.items()
+    )
+
+
+def render():
+    return "\n".join(histogram.render() for histogram in REGISTRY) + "\n"
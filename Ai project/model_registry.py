@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import threading
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_CONFIG = os.getenv("MODEL_CONFIG")
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "off")
+# torch | int8 | onnx | onnx-int8, see encoder_backends.py
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+
+DEFAULT_MODEL_PATHS = {
+    "all-mpnet-base-v2": r'D:\all-mpnet-base-v2',
+    # "all-mpnet-base-v2": r'F:\model\all-mpnet-base-v2',
+    "multi-qa-mpnet-base-dot-v1": r'D:\multi-qa-mpnet-base-dot-v1',
+    # "multi-qa-mpnet-base-dot-v1": r'F:\model\multi-qa-mpnet-base-dot-v1',
+    "salary": os.path.join(BASE_DIR, "modelSalary"),
+}
+
+
+def _load_config(path=MODEL_CONFIG):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_config = _load_config()
+
+
+def model_path(name):
+    """
+    Where model ``name`` lives: MODEL_PATH_<NAME> (upper case, "-" and "."
+    as "_") wins over the MODEL_CONFIG JSON file, which wins over the
+    built-in default.
+    """
+    env_name = "MODEL_PATH_" + name.upper().replace("-", "_").replace(".", "_")
+    return os.getenv(env_name) or _config.get(name) or DEFAULT_MODEL_PATHS[name]
+
+
+def backend_suffix(backend=EMBEDDING_BACKEND):
+    """File-name suffix that keeps vectors from different encoder backends apart."""
+    return "" if backend == "torch" else f"-{backend}"
+
+
+class ModelRegistry:
+    """
+    Loads models on first use. Each name maps to a zero-argument loader
+    that runs at most once, even when several threads ask at the same
+    time; load time and failures are kept for the /ready probe.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._status = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.warmup_requested = False
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._status.setdefault(name, {"loaded": False, "load_seconds": None, "error": None})
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            if name not in self._models:
+                print(f"Loading model {name}...")
+                started = time.perf_counter()
+                try:
+                    self._models[name] = self._loaders[name]()
+                except Exception as e:
+                    self._status[name]["error"] = str(e)
+                    raise
+                self._status[name].update({
+                    "loaded": True,
+                    "load_seconds": round(time.perf_counter() - started, 3),
+                    "error": None,
+                })
+        return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warm_up(self, names=None, background=True):
+        self.warmup_requested = True
+        names = list(names or self._loaders)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Warm-up of {name} failed: {e}")
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self):
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+    @property
+    def ready(self):
+        # without a warm-up every model loads on demand, so the process is always ready
+        if not self.warmup_requested:
+            return True
+        return all(status["loaded"] for status in self._status.values())
+
+
+registry = ModelRegistry()
+
+
+class LazyModel:
+    """
+    Stand-in for a registered model: the first attribute access loads it
+    through the registry, later ones go straight to the loaded object.
+    """
+
+    def __init__(self, name, registry=registry):
+        self._name = name
+        self._registry = registry
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyModel {self._name} ({state})>"
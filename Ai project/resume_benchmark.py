@@ -1,87 +1,266 @@
 import os
+import sys
 import json
+import time
+import argparse
+import threading
+import tracemalloc
 from math import fabs
-from app import analyze_resume_with_gemini
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from metrics import start_request, finish_request
 
-CV_DIR = "./benchmark/cvs"
-GT_DIR = "./benchmark/ground_truth"
-PRED_DIR = "./benchmark/predictions"
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-os.makedirs(PRED_DIR, exist_ok=True)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CV_DIR = os.path.join(BASE_DIR, "benchmark", "cvs")
+GT_DIR = os.path.join(BASE_DIR, "benchmark", "ground_truth")
+PRED_DIR = os.path.join(BASE_DIR, "benchmark", "predictions")
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmark", "results")
 
+STAGES = ["text_extraction", "llm_parse", "regex_extraction", "total"]
 
-tp = fp = fn = 0
-email_correct = phone_correct = exp_correct = total = 0
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark resume parsing latency, throughput and accuracy.")
+    parser.add_argument("--cvs", default=CV_DIR, help="folder of CV files (.pdf/.docx)")
+    parser.add_argument("--ground-truth", default=GT_DIR, help="folder of <cv name>.json ground truth files")
+    parser.add_argument("--predictions", default=PRED_DIR, help="where predictions are written")
+    parser.add_argument("--output", default=None, help="JSON report path (default: benchmark/results/<timestamp>.json)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="process the corpus this many times")
+    parser.add_argument("--llm", choices=["gemini", "mock"], default=os.getenv("RESUME_LLM", "gemini"))
+    parser.add_argument("--mock-latency", type=float, default=1.0, help="seconds per mocked LLM call")
+    parser.add_argument("--parser", choices=["llm", "local", "local-first"], default=None,
+                        help="resume parser mode (default: RESUME_PARSER)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also record the peak Python heap with tracemalloc (slows extraction down)")
+    return parser.parse_args(argv)
 
-for file in os.listdir(CV_DIR):
-    if not file.endswith(".pdf"):
-        continue
 
-    print(f"🔍 Processing {file}")
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values) * 1000
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 2),
+        "p90_ms": round(float(np.percentile(values, 90)), 2),
+        "p95_ms": round(float(np.percentile(values, 95)), 2),
+        "p99_ms": round(float(np.percentile(values, 99)), 2),
+        "max_ms": round(float(values.max()), 2),
+    }
 
 
-    cv_path = os.path.join(CV_DIR, file)
-    prediction = analyze_resume_with_gemini(cv_path)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
 
-    pred_path = os.path.join(PRED_DIR, file.replace(".pdf", ".json"))
-    with open(pred_path, "w", encoding="utf-8") as f:
-        json.dump(prediction, f, indent=2, ensure_ascii=False)
 
+def process_cv(cv, cv_path, parser_mode):
+    """
+    Runs the analyze_resume_with_gemini pipeline without the cache, timing
+    every stage separately.
+    """
+    timings = {}
+    started = time.perf_counter()
 
-    gt_path = os.path.join(GT_DIR, file.replace(".pdf", ".json"))
+    # the per-page regex pass runs inside extraction; cv records the two stages apart
+    start_request()
+    resume_text, looks_like_cv, fields = cv.extract_cv_document(cv_path)
+    for stage, seconds in finish_request():
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    if not looks_like_cv:
+        timings["total"] = time.perf_counter() - started
+        return dict(cv.NOT_A_CV_RESULT), timings
+
+    t = time.perf_counter()
+    parsed_json = cv.parse_locally(resume_text, fields, parser_mode)
+    parser = "local"
+    if parsed_json is None:
+        parsed_json = cv.analyze_with_gemini(resume_text) or {}
+        parser = "llm"
+    timings["llm_parse"] = time.perf_counter() - t
+
+    prediction = cv.build_resume_result(parsed_json, resume_text, fields, parser)
+    timings["total"] = time.perf_counter() - started
+    return prediction, timings
+
+
+def load_ground_truth(gt_dir, name):
+    gt_path = os.path.join(gt_dir, os.path.splitext(name)[0] + ".json")
     if not os.path.exists(gt_path):
-        print(f"Ground truth missing for {file}")
-        continue
+        return None
+    with open(gt_path, encoding="utf-8") as f:
+        gt = json.load(f)
+    # ground truth may be a bare field dict or a full analysis result
+    parser_output = gt.get("parser_output", {})
+    return {
+        "skills": gt.get("skills", parser_output.get("skills", [])),
+        "email": gt.get("email"),
+        "phone": gt.get("phone"),
+        "experience_years": gt.get("experience_years", gt.get("estimated_experience_years", 0)),
+    }
 
-    gt = json.load(open(gt_path, encoding="utf-8"))
 
+def accuracy_report(pairs):
+    tp = fp = fn = 0
+    email_correct = phone_correct = exp_correct = 0
+    for gt, prediction in pairs:
+        gt_skills = set(s.lower() for s in gt["skills"])
+        pred_skills = set(
+            s.lower() for s in prediction.get("parser_output", {}).get("skills", [])
+        )
+        tp += len(gt_skills & pred_skills)
+        fp += len(pred_skills - gt_skills)
+        fn += len(gt_skills - pred_skills)
 
-    gt_skills = set(s.lower() for s in gt.get("skills", []))
-    pred_skills = set(
-        s.lower() for s in prediction["parser_output"].get("skills", [])
-    )
+        if gt["email"] == prediction.get("email"):
+            email_correct += 1
+        if gt["phone"] == prediction.get("phone"):
+            phone_correct += 1
+        if fabs(float(gt["experience_years"] or 0) - float(prediction.get("estimated_experience_years", 0))) <= 1:
+            exp_correct += 1
 
-    tp += len(gt_skills & pred_skills)
-    fp += len(pred_skills - gt_skills)
-    fn += len(gt_skills - pred_skills)
+    total = len(pairs)
+    precision = tp / (tp + fp) if (tp + fp) else 0
+    recall = tp / (tp + fn) if (tp + fn) else 0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0
+    return {
+        "evaluated": total,
+        "skills_precision": round(precision, 4),
+        "skills_recall": round(recall, 4),
+        "skills_f1": round(f1, 4),
+        "email_accuracy": round(email_correct / total, 4) if total else 0,
+        "phone_accuracy": round(phone_correct / total, 4) if total else 0,
+        "experience_accuracy": round(exp_correct / total, 4) if total else 0,
+    }
 
 
-    if gt.get("email") == prediction.get("email"):
-        email_correct += 1
+def run_benchmark(args):
+    os.environ["RESUME_LLM"] = args.llm
+    os.environ["RESUME_CACHE"] = "off"
+    # imported late so RESUME_LLM decides which client cv.py builds
+    import cv
+    if args.llm == "mock":
+        cv.set_llm(cv.MockLLM(latency=args.mock_latency))
+    parser_mode = args.parser or cv.RESUME_PARSER
 
+    files = sorted(f for f in os.listdir(args.cvs) if f.lower().endswith((".pdf", ".docx")))
+    if not files:
+        raise SystemExit(f"No CVs found in {args.cvs}")
+    work = [name for _ in range(args.repeat) for name in files]
 
-    if gt.get("phone") == prediction.get("phone"):
-        phone_correct += 1
+    os.makedirs(args.predictions, exist_ok=True)
+    timings = {stage: [] for stage in STAGES}
+    predictions = {}
+    errors = []
+    lock = threading.Lock()
 
-    if fabs(
-        gt.get("experience_years", 0)
-        - prediction.get("estimated_experience_years", 0)
-    ) <= 1:
-        exp_correct += 1
+    def task(name):
+        print(f"🔍 Processing {name}")
+        try:
+            prediction, stage_times = process_cv(cv, os.path.join(args.cvs, name), parser_mode)
+        except Exception as e:
+            with lock:
+                errors.append({"file": name, "error": str(e)})
+            return
+        with lock:
+            for stage, seconds in stage_times.items():
+                timings[stage].append(seconds)
+            predictions[name] = prediction
 
-    total += 1
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(task, work))
+    wall_seconds = time.perf_counter() - started
+    peak_traced = None
+    if args.trace_memory:
+        peak_traced = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
 
+    pairs = []
+    for name, prediction in predictions.items():
+        with open(os.path.join(args.predictions, os.path.splitext(name)[0] + ".json"), "w", encoding="utf-8") as f:
+            json.dump(prediction, f, indent=2, ensure_ascii=False)
+        gt = load_ground_truth(args.ground_truth, name)
+        if gt is None:
+            print(f"Ground truth missing for {name}")
+            continue
+        pairs.append((gt, prediction))
 
-precision = tp / (tp + fp) if (tp + fp) else 0
-recall = tp / (tp + fn) if (tp + fn) else 0
-f1 = (
-    2 * precision * recall / (precision + recall)
-    if (precision + recall)
-    else 0
-)
+    processed = len(work) - len(errors)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "cvs": args.cvs,
+            "corpus_size": len(files),
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "llm": args.llm,
+            "mock_latency": args.mock_latency if args.llm == "mock" else None,
+            "parser": parser_mode,
+        },
+        "processed": processed,
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_cvs_per_min": round(processed / wall_seconds * 60, 2) if wall_seconds else 0,
+        "latency": {stage: percentiles(values) for stage, values in timings.items()},
+        "memory": {
+            "peak_python_heap_mb": round(peak_traced / (1024 * 1024), 1) if peak_traced is not None else None,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "accuracy": accuracy_report(pairs),
+    }
 
-email_acc = email_correct / total if total else 0
-phone_acc = phone_correct / total if total else 0
-exp_acc = exp_correct / total if total else 0
 
+def print_report(report):
+    print(f"\nCVs processed: {report['processed']} in {report['wall_seconds']}s "
+          f"({report['throughput_cvs_per_min']} CVs/min, concurrency {report['config']['concurrency']})\n")
+    print(f"{'stage':<18}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}  (ms)")
+    for stage, stats in report["latency"].items():
+        if stats["count"]:
+            print(f"{stage:<18}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+    memory = report["memory"]
+    print(f"\nPeak RSS: {memory['peak_rss_mb']} MB")
+    if memory["peak_python_heap_mb"] is not None:
+        print(f"Peak Python heap: {memory['peak_python_heap_mb']} MB")
+    print()
+
+    accuracy = report["accuracy"]
+    print(f"Total CVs evaluated: {accuracy['evaluated']}\n")
+    print("Skills Extraction")
+    print(f"Precision: {accuracy['skills_precision']:.2f}")
+    print(f"Recall:    {accuracy['skills_recall']:.2f}")
+    print(f"F1-score:  {accuracy['skills_f1']:.2f}\n")
+    print("Email Accuracy:", round(accuracy["email_accuracy"], 2))
+    print("Phone Accuracy:", round(accuracy["phone_accuracy"], 2))
+    print("Experience Accuracy (±1 year):", round(accuracy["experience_accuracy"], 2))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmark(args)
+    print_report(report)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"resume_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nReport written to {output}")
 
-print(f"Total CVs evaluated: {total}\n")
-print("Skills Extraction")
-print(f"Precision: {precision:.2f}")
-print(f"Recall:    {recall:.2f}")
-print(f"F1-score:  {f1:.2f}\n")
-print("Email Accuracy:", round(email_acc, 2))
-print("Phone Accuracy:", round(phone_acc, 2))
-print("Experience Accuracy (±1 year):", round(exp_acc, 2))
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESUME_CACHE_PATH = os.getenv(
+    "RESUME_CACHE_PATH",
+    os.path.join(BASE_DIR, "resumeCache", "resume_cache.sqlite3")
+)
+RESUME_CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(30 * 24 * 3600)))
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "20000"))
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sha256_text(text):
+    return sha256_bytes(text.encode("utf-8"))
+
+
+class ResumeCache:
+    """
+    SQLite-backed cache of full resume analysis results. Entries are keyed
+    by the SHA-256 of the file bytes ("file") or of the extracted text
+    ("text"), expire after ``ttl`` seconds and are evicted least recently
+    used beyond ``max_entries``.
+    """
+
+    def __init__(self, path=RESUME_CACHE_PATH, ttl=RESUME_CACHE_TTL, max_entries=RESUME_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = {"file": 0, "text": 0}
+        self.misses = 0
+        self.llm_seconds_saved = 0.0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS resume_cache ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " llm_seconds REAL NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS resume_cache_accessed ON resume_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, kind, digest):
+        key = f"{kind}:{digest}"
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, llm_seconds, created_at FROM resume_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM resume_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                return None
+            self._conn.execute("UPDATE resume_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits[kind] += 1
+            self.llm_seconds_saved += row[1]
+        return json.loads(row[0])
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, keys, result, llm_seconds=0.0):
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO resume_cache (key, result, llm_seconds, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(f"{kind}:{digest}", payload, llm_seconds, now, now) for kind, digest in keys]
+            )
+            self._conn.execute("DELETE FROM resume_cache WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM resume_cache WHERE key IN ("
+                " SELECT key FROM resume_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM resume_cache").fetchone()[0]
+            hits = self.hits["file"] + self.hits["text"]
+            total = hits + self.misses
+            return {
+                "file_hits": self.hits["file"],
+                "text_hits": self.hits["text"],
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "llm_seconds_saved": round(self.llm_seconds_saved, 3),
+                "size": size,
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM resume_cache")
+            self._conn.commit()
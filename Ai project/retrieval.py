@@ -0,0 +1,239 @@
+import os
+import threading
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "500"))
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "auto")
+RETRIEVAL_NPROBE = int(os.getenv("RETRIEVAL_NPROBE", "16"))
+
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=8, max_train=256, seed=0):
+    rng = np.random.RandomState(seed)
+    train = vectors
+    if len(train) > n_clusters * max_train:
+        train = train[rng.choice(len(train), n_clusters * max_train, replace=False)]
+
+    centroids = train[rng.choice(len(train), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = np.argmax(train @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, train)
+        counts = np.bincount(assign, minlength=n_clusters)
+        empty = counts == 0
+        sums[empty] = centroids[empty]
+        centroids = _unit(sums)
+    return centroids
+
+
+class NumpyIVFIndex:
+    """
+    Inverted-file index over unit vectors (inner product == cosine).
+    Below ``min_train_size`` vectors it does an exact scan; above it, vectors
+    are clustered into ~sqrt(N) lists and a query only scores the vectors in
+    its ``nprobe`` closest lists. Lists are retrained when the index doubles.
+    """
+
+    def __init__(self, dim, nprobe=RETRIEVAL_NPROBE, min_train_size=2048):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._assign = np.zeros(0, dtype=np.int64)
+        self._keys = []
+        self._pos = {}
+        self.centroids = None
+        self._trained_size = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, keys, vectors):
+        vectors = _unit(vectors)
+        self.remove([k for k in keys if k in self._pos])
+
+        start = len(self._keys)
+        for i, key in enumerate(keys):
+            self._pos[key] = start + i
+        self._keys.extend(keys)
+        self._vectors = np.vstack([self._vectors, vectors])
+
+        if self.centroids is not None:
+            new_assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        else:
+            new_assign = np.zeros(len(keys), dtype=np.int64)
+        self._assign = np.concatenate([self._assign, new_assign])
+
+        if len(self) >= self.min_train_size and len(self) >= 2 * self._trained_size:
+            self.train()
+
+    def remove(self, keys):
+        for key in keys:
+            row = self._pos.pop(key, None)
+            if row is None:
+                continue
+            last = len(self._keys) - 1
+            if row != last:
+                moved = self._keys[last]
+                self._keys[row] = moved
+                self._vectors[row] = self._vectors[last]
+                self._assign[row] = self._assign[last]
+                self._pos[moved] = row
+            self._keys.pop()
+            self._vectors = self._vectors[:last]
+            self._assign = self._assign[:last]
+
+    def train(self):
+        n_lists = max(1, int(np.sqrt(len(self))))
+        self.centroids = spherical_kmeans(self._vectors, n_lists)
+        self._assign = np.argmax(self._vectors @ self.centroids.T, axis=1)
+        self._trained_size = len(self)
+
+    def search(self, query, k, allowed_keys=None):
+        if not len(self):
+            return []
+        query = _unit(query)[0]
+
+        if self.centroids is not None:
+            probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+            rows = np.flatnonzero(np.isin(self._assign, probe))
+        else:
+            rows = np.arange(len(self))
+
+        if allowed_keys is not None:
+            allowed_rows = np.fromiter(
+                (self._pos[key] for key in allowed_keys if key in self._pos), dtype=np.int64
+            )
+            probed = rows[np.isin(rows, allowed_rows)]
+            # too few allowed vectors in the probed lists: score every allowed one
+            rows = probed if len(probed) >= k else allowed_rows
+        if not len(rows):
+            return []
+
+        scores = self._vectors[rows] @ query
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self._keys[rows[i]], float(scores[i])) for i in top]
+
+
+class FaissIVFIndex:
+    """
+    Same interface as ``NumpyIVFIndex`` backed by FAISS: an exact
+    ``IndexFlatIP`` until ``min_train_size`` vectors, then ``IndexIVFFlat``.
+    """
+
+    def __init__(self, dim, nprobe=RETRIEVAL_NPROBE, min_train_size=2048):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self._vectors = {}
+        self._ids = {}
+        self._keys = {}
+        self._next_id = 0
+        self._trained_size = 0
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def _id_for(self, key):
+        if key not in self._ids:
+            self._ids[key] = self._next_id
+            self._keys[self._next_id] = key
+            self._next_id += 1
+        return self._ids[key]
+
+    def add(self, keys, vectors):
+        vectors = _unit(vectors)
+        self.remove([k for k in keys if k in self._vectors])
+        ids = np.array([self._id_for(k) for k in keys], dtype=np.int64)
+        for key, vector in zip(keys, vectors):
+            self._vectors[key] = vector
+        self.index.add_with_ids(vectors, ids)
+
+        if len(self) >= self.min_train_size and len(self) >= 2 * self._trained_size:
+            self.train()
+
+    def remove(self, keys):
+        ids = [self._ids[k] for k in keys if self._vectors.pop(k, None) is not None]
+        if ids:
+            self.index.remove_ids(np.array(ids, dtype=np.int64))
+
+    def train(self):
+        keys = list(self._vectors)
+        vectors = np.stack([self._vectors[k] for k in keys])
+        n_lists = max(1, int(np.sqrt(len(keys))))
+        quantizer = faiss.IndexFlatIP(self.dim)
+        index = faiss.IndexIVFFlat(quantizer, self.dim, n_lists, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = self.nprobe
+        index.add_with_ids(vectors, np.array([self._ids[k] for k in keys], dtype=np.int64))
+        self.index = index
+        self._trained_size = len(keys)
+
+    def search(self, query, k, allowed_keys=None):
+        if not len(self):
+            return []
+        query = _unit(query)
+        fetch = k if allowed_keys is None else min(len(self), 4 * k)
+        while True:
+            scores, ids = self.index.search(query, fetch)
+            hits = [
+                (self._keys[i], float(s)) for s, i in zip(scores[0], ids[0])
+                if i != -1 and (allowed_keys is None or self._keys[i] in allowed_keys)
+            ]
+            if len(hits) >= k or fetch >= len(self):
+                return hits[:k]
+            fetch = min(len(self), fetch * 4)
+
+
+def create_ann_index(dim, backend=RETRIEVAL_BACKEND):
+    if backend == "faiss" or (backend == "auto" and faiss is not None):
+        return FaissIVFIndex(dim)
+    return NumpyIVFIndex(dim)
+
+
+class JobRetriever:
+    """
+    Candidate retrieval over stored job-text embeddings. Kept in sync by
+    ``JobEmbeddingIndex`` as jobs are added, edited and removed.
+    """
+
+    def __init__(self, backend=RETRIEVAL_BACKEND):
+        self.backend = backend
+        self.index = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index) if self.index is not None else 0
+
+    def add(self, keys, vectors):
+        if not keys:
+            return
+        with self._lock:
+            if self.index is None:
+                self.index = create_ann_index(np.asarray(vectors).shape[1], self.backend)
+            self.index.add(list(keys), vectors)
+
+    def remove(self, keys):
+        with self._lock:
+            if self.index is not None:
+                self.index.remove(list(keys))
+
+    def search(self, query, k=RETRIEVAL_TOP_K, allowed_keys=None):
+        with self._lock:
+            if self.index is None:
+                return []
+            return [key for key, _ in self.index.search(query, k, allowed_keys)]
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+SKILL_WEIGHT = 0.5
+EDUCATION_WEIGHT = 0.3
+EXPERIENCE_WEIGHT = 0.2
+
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def segment_ids(lengths):
+    return np.repeat(np.arange(len(lengths)), lengths)
+
+
+def skill_scores(resume_skill_embs, job_skill_embs_list):
+    """
+    Mean over each job's skills of the best cosine similarity against any
+    resume skill, computed with one similarity matrix for all jobs.
+    """
+    n_jobs = len(job_skill_embs_list)
+    lengths = np.array([len(e) for e in job_skill_embs_list], dtype=np.int64)
+    if resume_skill_embs is None or len(resume_skill_embs) == 0 or lengths.sum() == 0:
+        return np.zeros(n_jobs, dtype=np.float32)
+
+    all_job_skills = np.concatenate([e for e in job_skill_embs_list if len(e)])
+    sim = normalize_rows(resume_skill_embs) @ normalize_rows(all_job_skills).T
+    best_per_skill = sim.max(axis=0)
+
+    sums = np.bincount(segment_ids(lengths), weights=best_per_skill, minlength=n_jobs)
+    return np.where(lengths > 0, sums / np.maximum(lengths, 1), 0.0).astype(np.float32)
+
+
+def education_scores(resume_education, job_educations):
+    """
+    1.0 for every job with a requirement that contains, or is contained in,
+    one of the resume's education entries. Each distinct requirement string
+    is checked once.
+    """
+    n_jobs = len(job_educations)
+    lengths = np.array([len(e) for e in job_educations], dtype=np.int64)
+    if not resume_education or lengths.sum() == 0:
+        return np.zeros(n_jobs, dtype=np.float32)
+
+    flat = [req for reqs in job_educations for req in reqs]
+    distinct, inverse = np.unique(np.array(flat, dtype=object), return_inverse=True)
+    distinct_matched = np.array([
+        any(edu in req or req in edu for edu in resume_education)
+        for req in distinct
+    ], dtype=np.float64)
+
+    hits = np.bincount(segment_ids(lengths), weights=distinct_matched[inverse], minlength=n_jobs)
+    return (hits > 0).astype(np.float32)
+
+
+def experience_scores(resume_experience, job_experiences):
+    job_experiences = np.asarray(job_experiences, dtype=np.float32)
+    return np.minimum(resume_experience / np.maximum(job_experiences, 1), 1.0).astype(np.float32)
+
+
+def base_scores(resume_skill_embs, job_skill_embs_list, resume_education,
+                job_educations, resume_experience, job_experiences):
+    return (
+        SKILL_WEIGHT * skill_scores(resume_skill_embs, job_skill_embs_list)
+        + EDUCATION_WEIGHT * education_scores(resume_education, job_educations)
+        + EXPERIENCE_WEIGHT * experience_scores(resume_experience, job_experiences)
+    )
+
+
+def top_k_indices(scores, k):
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    return order[:k]
@@ -1,12 +1,28 @@
+import os
+import json
+import tempfile
 import pytest
+import numpy as np
 from unittest.mock import patch, MagicMock
 
+# keep the job embedding index built by these tests out of the repo
+os.environ.setdefault("JOB_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "job_embeddings.sqlite3"))
+
 # =====================================================
 # 🔴 PREVENT LOADING SENTENCE TRANSFORMER MODEL
 # =====================================================
+
+def fake_encode(sentences, **kwargs):
+    # one fixed-size vector per sentence, like the real model
+    texts = [sentences] if isinstance(sentences, str) else list(sentences)
+    embs = np.ones((len(texts), 8), dtype=np.float32)
+    return embs[0] if isinstance(sentences, str) else embs
+
+
 with patch("sentence_transformers.SentenceTransformer") as MockST:
     mock_instance = MagicMock()
-    mock_instance.encode.return_value = MagicMock()
+    mock_instance.encode.side_effect = fake_encode
+    mock_instance.get_sentence_embedding_dimension.return_value = 8
     MockST.return_value = mock_instance
 
     from app import app
@@ -166,6 +182,96 @@ def test_predict_salary_valid(mock_predict, client):
     assert "estimated_salary" in res.get_json()
 
 
+def test_estimate_salaries_single_pass():
+    """
+    White-Box Path:
+    N rows -> each distinct string grouped once, one predict call
+    """
+    import app as app_module
+
+    salary_model = MagicMock()
+    salary_model.feature_names_in_ = np.array(['Education_Encoded', 'Job_Encoded', 'Years of Experience'])
+    salary_model.predict.side_effect = lambda X: X.to_numpy().sum(axis=1)
+    scaler_x = MagicMock()
+    scaler_x.transform.side_effect = lambda X: X.to_numpy() * 2
+    scaler_y = MagicMock()
+    scaler_y.inverse_transform.side_effect = lambda y: y + 1
+
+    with patch.multiple(app_module, model=salary_model, scaler_X=scaler_x, scaler_y=scaler_y,
+                        edu_importance={"Bachelors": 2, "Masters": 3},
+                        job_importance={"Software/Developer": 5}), \
+            patch("app.group_education", wraps=app_module.group_education) as grouping:
+        grouped, categories, salaries = app_module.estimate_salaries(
+            ["Bachelor", "Master", "Bachelor"], ["python developer", "chef", "python developer"], [1, 2, 3]
+        )
+
+    assert grouping.call_count == 2
+    salary_model.predict.assert_called_once()
+    assert grouped == ["Bachelors", "Masters", "Bachelors"]
+    assert categories == ["Software/Developer", "Other", "Software/Developer"]
+    # edu + job + 2 * years, plus one from the inverse transform
+    assert salaries.tolist() == [10.0, 9.0, 14.0]
+
+
+def test_skill_matches_from_similarity_matrix():
+    """
+    White-Box Path:
+    Known candidate x job matrix -> closest candidate per job skill, strict threshold,
+    duplicates kept per job skill and matched skills equal to the old pairwise loop
+    """
+    import torch
+    import app as app_module
+
+    candidate_skills = ["python", "sql", "py"]
+    job_skills = ["Python", "Docker", "SQL", "Python"]
+    scores = torch.tensor([
+        [0.95, 0.30, 0.10, 0.95],
+        [0.20, 0.70, 0.88, 0.20],
+        [0.90, 0.10, 0.05, 0.97],
+    ], dtype=torch.float64)
+
+    matches = app_module.skill_matches(candidate_skills, job_skills, cosine_scores=scores)
+
+    assert matches == [
+        {"job_skill": "Python", "candidate_skill": "python", "score": 0.95, "matched": True},
+        {"job_skill": "Docker", "candidate_skill": "sql", "score": 0.7, "matched": False},
+        {"job_skill": "SQL", "candidate_skill": "sql", "score": 0.88, "matched": True},
+        {"job_skill": "Python", "candidate_skill": "py", "score": 0.97, "matched": True},
+    ]
+    old_loop = {
+        jskill for i in range(len(candidate_skills)) for j, jskill in enumerate(job_skills) if scores[i][j] > 0.7
+    }
+    matched = app_module.match_skills(candidate_skills, job_skills, cosine_scores=scores)
+    assert matched == ["Python", "SQL"]
+    assert set(matched) == old_loop
+    assert app_module.skill_matches([], job_skills, cosine_scores=scores) == []
+
+
+def test_predict_salary_batch_endpoint(client):
+    """
+    White-Box Path:
+    Invalid rows get an error, valid rows share one predict_salaries call
+    """
+    with patch("app.predict_salaries") as mock_batch:
+        mock_batch.side_effect = lambda apps: [
+            {"estimated_salary": 12000, "job_category": "Other", "matched_skills": [], "similarity_score": 0.5}
+            for _ in apps
+        ]
+        res = client.post("/predict-salary-batch", json={"applications": [
+            {"id": 1, "candidate_skills": ["python"], "candidate_education": ["Bachelor"], "job_title": "Dev"},
+            {"id": 2, "candidate_skills": [], "candidate_education": ["Bachelor"]},
+            {"id": 3, "candidate_skills": ["java"], "candidate_education": "Master", "candidate_experience": 4},
+        ]})
+
+    assert res.status_code == 200
+    results = res.get_json()["results"]
+    assert [r["id"] for r in results] == [1, 2, 3]
+    assert "error" in results[1]
+    assert results[2]["monthly_salary"] == 1000
+    mock_batch.assert_called_once()
+    assert len(mock_batch.call_args.args[0]) == 2
+
+
 # =====================================================
 # 4) TEST /predict-acceptance
 # =====================================================
@@ -185,3 +291,194 @@ def test_predict_acceptance(client):
     res = client.post("/predict-acceptance", json=payload)
     assert res.status_code == 200
     assert "acceptance_score" in res.get_json()
+
+
+# =====================================================
+# 5) TEST /jobs/index
+# =====================================================
+
+@patch("app.job_index")
+def test_index_jobs(mock_index, client):
+    """
+    White-Box Path:
+    Jobs pushed from JobsService are synced into the index
+    """
+    mock_index.__len__.return_value = 1
+    payload = {"jobs": [{"id": 7, "title": "Dev", "description": "", "requiredSkills": ["python"]}]}
+
+    res = client.post("/jobs/index", json=payload)
+    assert res.status_code == 200
+    mock_index.sync.assert_called_once_with(payload["jobs"])
+
+
+def test_index_jobs_missing_id(client):
+    """
+    White-Box Path:
+    Job without id -> Error 400
+    """
+    res = client.post("/jobs/index", json={"jobs": [{"title": "Dev"}]})
+    assert res.status_code == 400
+
+
+@patch("app.job_index")
+def test_remove_indexed_job(mock_index, client):
+    """
+    White-Box Path:
+    Closed job is dropped from the index
+    """
+    mock_index.remove.return_value = True
+    mock_index.__len__.return_value = 0
+
+    res = client.delete("/jobs/index/7")
+    assert res.status_code == 200
+    assert res.get_json()["removed"] is True
+    mock_index.remove.assert_called_once_with("7")
+
+
+# =====================================================
+# 6) TEST /score-application
+# =====================================================
+
+def test_score_application_missing_fields(client):
+    """
+    White-Box Path:
+    Missing education -> Error 400
+    """
+    payload = {
+        "candidate_skills": ["python"],
+        "job_required_skills": ["python"],
+        "job_title": "Backend Developer"
+    }
+
+    res = client.post("/score-application", json=payload)
+    assert res.status_code == 400
+
+
+@patch("app.predict_salary")
+@patch("app.acceptance_score")
+@patch("app.encode_application")
+def test_score_application_shares_encoding(mock_encode, mock_acceptance, mock_salary, client):
+    """
+    White-Box Path:
+    One encoding is reused for acceptance and salary
+    """
+    mock_acceptance.return_value = {"acceptance_score": 0.8, "matched_skills": ["python"], "skill_matches": []}
+    mock_salary.return_value = {
+        "estimated_salary": 60000,
+        "job_category": "Software/Developer",
+        "matched_skills": ["python"],
+        "similarity_score": 0.7
+    }
+
+    payload = {
+        "candidate_skills": ["python"],
+        "candidate_education": ["Bachelor"],
+        "candidate_experience": 3,
+        "job_title": "Backend Developer",
+        "job_required_skills": ["python"],
+        "job_description": "Looking for python developer"
+    }
+
+    res = client.post("/score-application", json=payload)
+    assert res.status_code == 200
+    data = res.get_json()
+    assert data["acceptance_score"] == 0.8
+    assert data["monthly_salary"] == 5000
+    mock_encode.assert_called_once()
+    assert mock_acceptance.call_args.args[-1] is mock_encode.return_value
+    assert mock_salary.call_args.args[-1] is mock_encode.return_value
+
+
+# =====================================================
+# 7) TEST /rank-applicants
+# =====================================================
+
+def test_rank_applicants_missing_candidates(client):
+    """
+    White-Box Path:
+    No candidates -> Error 400
+    """
+    res = client.post("/rank-applicants", json={"job": {"job_title": "Dev"}})
+    assert res.status_code == 400
+
+
+@patch("app.score_applicants")
+@patch("app.encode_applicants")
+@patch("app.encode_job")
+def test_rank_applicants_streams_ndjson(mock_job, mock_applicants, mock_score, client):
+    """
+    White-Box Path:
+    Job encoded once, one NDJSON line per candidate
+    """
+    mock_applicants.side_effect = lambda skill_lists, job_encoding: [{} for _ in skill_lists]
+    mock_score.side_effect = lambda chunk, *args: [{"id": c["id"], "acceptance_score": 0.5} for c in chunk]
+
+    payload = {
+        "job": {"job_title": "Dev", "job_required_skills": ["python"], "job_description": ""},
+        "candidates": [
+            {"id": 1, "candidate_skills": ["python"], "candidate_education": ["Bachelor"]},
+            {"id": 2, "candidate_skills": ["java"], "candidate_education": ["Bachelor"]}
+        ]
+    }
+
+    res = client.post("/rank-applicants", json=payload)
+    assert res.status_code == 200
+    assert res.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [line["id"] for line in lines] == [1, 2]
+    mock_job.assert_called_once()
+
+
+# =====================================================
+# 8) TEST async /analyze queue
+# =====================================================
+
+@patch("app.analyze_resume_with_gemini")
+def test_analyze_async_queue(mock_gemini, client):
+    """
+    White-Box Path:
+    async=1 -> 202 with id, then poll for the result
+    """
+    import time
+
+    mock_gemini.return_value = {
+        "parser_output": {
+            "summary": "Queued summary",
+            "skills": ["python"],
+            "education": {"degree": "BSc"},
+            "experience_years": 2
+        }
+    }
+
+    res = client.post("/analyze?async=1", json={"file_path": "dummy.pdf"})
+    assert res.status_code == 202
+    analysis_id = res.get_json()["analysis_id"]
+
+    for _ in range(50):
+        res = client.get(f"/analyze/{analysis_id}")
+        if res.status_code != 202:
+            break
+        time.sleep(0.02)
+
+    assert res.status_code == 200
+    assert res.get_json()["parser_output"]["summary"] == "Queued summary"
+
+
+def test_analyze_unknown_id(client):
+    """
+    White-Box Path:
+    Unknown analysis id -> Error 404
+    """
+    res = client.get("/analyze/does-not-exist")
+    assert res.status_code == 404
+
+
+def test_ready_without_warm_up(client):
+    """
+    White-Box Path:
+    Models load on demand -> ready reported with per-model status
+    """
+    res = client.get("/ready")
+    assert res.status_code == 200
+    assert res.get_json()["ready"] is True
+    assert "salary_predictor" in res.get_json()["models"]
@@ -0,0 +1,258 @@
+import os
+from unittest.mock import patch
+
+os.environ.setdefault("RESUME_LLM", "mock")
+
+import cv
+
+
+CV_PAGE = "Experience\nEducation\nSkills: python\njohn@example.com"
+
+
+def fake_pages(pages, consumed):
+    def iter_pages(file_path, start=0, workers=1):
+        for i, text in enumerate(pages[start:], start):
+            consumed.append(i)
+            yield text
+    return iter_pages
+
+
+def test_extract_cv_text_stops_early_for_non_cv():
+    """
+    White-Box Path:
+    First scan pages are not a CV -> rest never extracted
+    """
+    consumed = []
+    pages = ["annual report"] * 200
+    with patch("cv.iter_pdf_pages", fake_pages(pages, consumed)):
+        text, looks_like_cv = cv.extract_cv_text("report.pdf", scan_pages=3)
+
+    assert looks_like_cv is False
+    assert consumed == [0, 1, 2]
+
+
+def test_extract_cv_text_reads_all_pages_of_cv():
+    """
+    White-Box Path:
+    CV detected on page 1 -> remaining pages still extracted
+    """
+    consumed = []
+    pages = [CV_PAGE, "projects", "references"]
+    with patch("cv.iter_pdf_pages", fake_pages(pages, consumed)):
+        text, looks_like_cv = cv.extract_cv_text("cv.pdf")
+
+    assert looks_like_cv is True
+    assert text == "\n".join(pages)
+    assert consumed == [0, 1, 2]
+
+
+def test_page_fields_match_full_text_and_run_once_per_page():
+    """
+    White-Box Path:
+    Streaming fields merged per page equal one pass over the full text; each page scanned once
+    """
+    pages = [
+        "Profile\nExperience",
+        "Backend developer Jan 2018 - Dec 2020\njohn@example.com",
+        "Education\n2014 - 2018 +44 20 7946 0958",
+        "Skills: python",
+    ]
+    consumed = []
+    with patch("cv.iter_pdf_pages", fake_pages(pages, consumed)), \
+            patch("cv.extract_fields", wraps=cv.extract_fields) as extract:
+        text, looks_like_cv, fields = cv.extract_cv_document("cv.pdf")
+
+    assert looks_like_cv is True
+    assert consumed == [0, 1, 2, 3]
+    # one empty seed plus one call per page, never the joined text
+    assert extract.call_count == len(pages) + 1
+    expected = cv.extract_fields(text)
+    assert {k: v for k, v in fields.items() if k != "date_ranges"} == \
+        {k: v for k, v in expected.items() if k != "date_ranges"}
+    assert [r[0] for r in fields["date_ranges"]] == [r[0] for r in expected["date_ranges"]]
+
+
+def test_text_and_regex_stages_are_timed_apart():
+    """
+    White-Box Path:
+    Regex time is recorded as regex_extraction only, page reading as text_extraction only
+    """
+    import time
+    from metrics import start_request, finish_request
+
+    def slow_pages(file_path, start=0, workers=1):
+        for text in ["Experience Education", "Skills: python"][start:]:
+            time.sleep(0.05)
+            yield text
+
+    def slow_fields(text):
+        time.sleep(0.05)
+        return extract_fields(text)
+
+    extract_fields = cv.extract_fields
+    start_request()
+    with patch("cv.iter_pdf_pages", slow_pages), patch("cv.extract_fields", slow_fields):
+        cv.extract_cv_document("cv.pdf")
+    timings = dict(finish_request())
+
+    assert set(timings) == {"text_extraction", "regex_extraction"}
+    # two pages read; the empty seed plus one regex pass per page
+    assert 0.1 <= timings["text_extraction"] < 0.15
+    assert 0.15 <= timings["regex_extraction"] < 0.2
+
+
+def test_extract_fields_parses_ranges_without_exceptions():
+    """
+    White-Box Path:
+    Valid month/year and year ranges counted, "Jan. 2020" and "Jan2020" skipped
+    """
+    from datetime import datetime
+    from cv_fields import extract_fields
+
+    text = (
+        "Work Experience\nJan 2018 - Jan 2020\n2020 - Present\n"
+        "Jan. 2015 - 2016\nJan2014 - 2015\njohn@example.com"
+    )
+    fields = extract_fields(text, now=datetime(2022, 1, 1))
+
+    assert fields["email"] == "john@example.com"
+    assert fields["keywords"] == {"work experience", "experience"}
+    assert fields["experience_years"] == 4.0
+    assert cv.is_likely_cv(text) is True
+
+
+class FlakyBatchLLM:
+    """Answers batch prompts but always drops resume 1 from the response."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        import json, re
+        ids = [int(i) for i in re.findall(r"<<<RESUME (\d+)>>>", prompt)]
+        if not ids:
+            return json.dumps({"skills": ["Python"], "education": {}})
+        return json.dumps([{"id": i, "skills": [f"skill-{i}"]} for i in ids if i != 1])
+
+
+def test_batch_parse_packs_resumes_into_one_request():
+    """
+    White-Box Path:
+    Five small resumes within budget -> single LLM request, output split per resume
+    """
+    mock = cv.MockLLM()
+    with patch("cv.llm", mock):
+        results = cv.analyze_batch_with_gemini(["resume %d" % i for i in range(5)])
+
+    assert mock.calls == 1
+    assert len(results) == 5
+    assert all(r["skills"] == cv.MOCK_PARSER_OUTPUT["skills"] for r in results)
+
+
+def test_batch_parse_retries_only_failed_items():
+    """
+    White-Box Path:
+    Item missing from batch response -> only that resume is re-sent
+    """
+    flaky = FlakyBatchLLM()
+    with patch("cv.llm", flaky):
+        results = cv.analyze_batch_with_gemini(["a", "b", "c"], retries=1)
+
+    assert len(flaky.prompts) == 2
+    assert "<<<RESUME" not in flaky.prompts[1] and "\nb\n" in flaky.prompts[1]
+    assert results[0] == {"skills": ["skill-0"]}
+    assert results[1] == {"skills": ["Python"], "education": {}}
+    assert results[2] == {"skills": ["skill-2"]}
+
+
+def test_plan_batches_respects_token_budget():
+    """
+    White-Box Path:
+    Budget fits two resumes -> batches of two, oversized resume alone
+    """
+    overhead = cv.estimate_tokens(cv.batch_resume_prompt([]))
+    small = "x" * 400
+    budget = overhead + 2 * (cv.estimate_tokens(small) + cv.RESUME_OUTPUT_TOKENS)
+    texts = [small, small, small, "y" * 100000, small]
+
+    assert cv.plan_batches(texts, token_budget=budget) == [[0, 1], [2], [3], [4]]
+
+
+LOCAL_CV = """Jane Doe
+Email: jane@example.com | Address: Aleppo
+Summary
+Backend developer building APIs with Node.js and Python.
+Education
+Bachelor's in Computer Engineering
+Aleppo University
+Experience
+Backend Developer, Jan 2020 - Jan 2023
+Built REST APIs with NestJS, PostgreSQL and Docker.
+Languages
+Arabic, English
+"""
+
+
+def test_local_parser_matches_llm_schema():
+    """
+    White-Box Path:
+    Gazetteer + regex parse -> same parser_output keys, aliases canonicalised
+    """
+    from local_parser import parse_resume_locally
+
+    parsed, confidence = parse_resume_locally(LOCAL_CV)
+
+    assert set(parsed) == set(cv.MOCK_PARSER_OUTPUT)
+    assert parsed["skills"] == ["Node.js", "Python", "REST APIs", "Nest.js", "PostgreSQL", "Docker"]
+    assert parsed["education"] == {
+        "degree": "Bachelor's in Computer Engineering",
+        "university": "Aleppo University",
+        "major": "Computer Engineering",
+    }
+    assert parsed["languages"] == ["Arabic", "English"]
+    assert parsed["location"] == "Aleppo"
+    assert parsed["experience_years"] == 3.0
+    assert confidence == 1.0
+
+
+def test_local_parser_ignores_common_words_outside_skill_context():
+    """
+    White-Box Path:
+    Ambiguous aliases in prose are dropped; on a skills line or next to another technology they count
+    """
+    from local_parser import parse_resume_locally
+
+    prose = (
+        "Summary\n"
+        "I express ideas clearly and react quickly to change.\n"
+        "Experience\n"
+        "Spring internship at a swift-moving startup, Jan 2020 - Jan 2021.\n"
+    )
+    parsed, _ = parse_resume_locally(prose)
+    assert parsed["skills"] == []
+
+    listed = prose + "Skills\nSwift, Git\nTools: Spring\n"
+    assert parse_resume_locally(listed)[0]["skills"] == ["Swift", "Git", "Spring Boot"]
+
+    inline = "Experience\nBuilt an Express API on Node.js, deployed with Git and Docker.\n"
+    assert parse_resume_locally(inline)[0]["skills"] == ["Express.js", "Node.js", "Git", "Docker"]
+
+
+def test_local_first_falls_back_to_llm_when_unsure():
+    """
+    White-Box Path:
+    local-first + confident parse -> no LLM call; low confidence -> LLM used
+    """
+    mock = cv.MockLLM()
+    with patch("cv.llm", mock), patch("cv.RESUME_PARSER", "local-first"), \
+            patch("cv.extract_cv_document", lambda path: (
+                (LOCAL_CV, True, cv.extract_fields(LOCAL_CV)) if path == "good.pdf"
+                else ("cv\nprofile\na@b.com", True, cv.extract_fields("cv\nprofile\na@b.com")))):
+        confident = cv.analyze_resume_with_gemini("good.pdf", use_cache=False)
+        assert mock.calls == 0
+        unsure = cv.analyze_resume_with_gemini("thin.pdf", use_cache=False)
+
+    assert confident["parser"] == "local"
+    assert unsure["parser"] == "llm"
+    assert mock.calls == 1
@@ -0,0 +1,80 @@
+import numpy as np
+from unittest.mock import MagicMock
+
+from embedding_cache import CachedEncoder
+
+
+def fake_model():
+    model = MagicMock()
+    model.encode.side_effect = lambda texts, **kw: np.array(
+        [[float(len(t)), 1.0] for t in texts], dtype=np.float32
+    )
+    model.get_sentence_embedding_dimension.return_value = 2
+    return model
+
+
+def test_only_unseen_strings_are_encoded():
+    """
+    White-Box Path:
+    Normalized repeats are served from the cache
+    """
+    model = fake_model()
+    encoder = CachedEncoder(model, maxsize=10)
+
+    first = encoder.encode(["Python", "React"])
+    second = encoder.encode(["  python ", "react", "node.js"])
+
+    assert model.encode.call_args_list[0].args[0] == ["python", "react"]
+    assert model.encode.call_args_list[1].args[0] == ["node.js"]
+    assert np.array_equal(first, second[:2])
+    assert encoder.stats()["hits"] == 2
+    assert encoder.stats()["misses"] == 3
+
+
+def test_lru_eviction_and_single_string():
+    """
+    White-Box Path:
+    Oldest entry evicted once maxsize is reached
+    """
+    encoder = CachedEncoder(fake_model(), maxsize=2)
+    encoder.encode(["a", "b"])
+    encoder.encode("a")
+    encoder.encode("c")
+
+    assert len(encoder) == 2
+    assert "b" not in encoder._cache
+    assert encoder.encode("a", convert_to_tensor=True).shape == (2,)
+
+
+def test_warm_start_round_trip(tmp_path):
+    """
+    White-Box Path:
+    Saved cache is loaded by a new encoder
+    """
+    path = str(tmp_path / "cache.pkl")
+    encoder = CachedEncoder(fake_model(), warm_start_path=path)
+    encoder.encode(["python"])
+    encoder.save()
+
+    model = fake_model()
+    warm = CachedEncoder(model, warm_start_path=path)
+    warm.encode(["python"])
+    model.encode.assert_not_called()
+
+
+def test_token_metric_tokenizes_only_sampled_miss_batches():
+    """
+    White-Box Path:
+    Only every ENCODE_TOKENS_SAMPLE_EVERY-th miss batch goes through the tokenizer again
+    """
+    from unittest.mock import patch
+
+    model = fake_model()
+    model.tokenizer.side_effect = lambda texts, **kw: {"input_ids": [[1] * len(t.split()) for t in texts]}
+    encoder = CachedEncoder(model, maxsize=100)
+    with patch("embedding_cache.ENCODE_TOKENS_SAMPLE_EVERY", 5):
+        for i in range(10):
+            encoder.encode([f"skill {i}"])
+
+    assert model.encode.call_count == 10
+    assert model.tokenizer.call_count == 2
@@ -0,0 +1,87 @@
+import time
+import threading
+import numpy as np
+from unittest.mock import MagicMock
+
+from embedding_server import EmbeddingServer
+
+
+def slow_model(delay=0.02):
+    model = MagicMock()
+
+    def encode(texts, **kw):
+        time.sleep(delay)
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+    model.encode.side_effect = encode
+    model.get_sentence_embedding_dimension.return_value = 2
+    return model
+
+
+def test_concurrent_requests_share_forward_passes():
+    """
+    White-Box Path:
+    Requests arriving while a pass runs are merged, each caller gets its own slice
+    """
+    model = slow_model()
+    server = EmbeddingServer(model, max_batch_size=64, max_wait_ms=5)
+    results = {}
+
+    def call(i):
+        results[i] = server.encode(["x" * i, "y" * (i + 1)])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(1, 17)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert model.encode.call_count < 16
+    for i in range(1, 17):
+        assert results[i][:, 0].tolist() == [i, i + 1]
+
+
+def test_batches_never_exceed_max_batch_size():
+    """
+    White-Box Path:
+    Queued multi-text requests that would overflow a batch wait for the next one
+    """
+    model = slow_model()
+    server = EmbeddingServer(model, max_batch_size=4, max_wait_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = server.encode(["x" * i, "y" * i, "z" * i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(1, 13)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    sizes = [len(call.args[0]) for call in model.encode.call_args_list]
+    assert max(sizes) <= 4
+    assert sum(sizes) == 36
+    for i in range(1, 13):
+        assert results[i][:, 0].tolist() == [i, i, i]
+
+
+def test_single_string_and_large_request():
+    """
+    White-Box Path:
+    Single string -> 1-D vector; request larger than a batch -> split into full batches on the worker
+    """
+    model = slow_model(delay=0)
+    server = EmbeddingServer(model, max_batch_size=4, max_wait_ms=1)
+    threads = []
+    model.encode.side_effect = lambda texts, **kw: (
+        threads.append(threading.current_thread().name)
+        or np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+    )
+
+    assert server.encode("abc").tolist() == [3.0, 1.0]
+    out = server.encode(["a", "bb", "ccc", "dddd", "eeeee", "ffffff"])
+    assert out[:, 0].tolist() == [1, 2, 3, 4, 5, 6]
+    assert [len(call.args[0]) for call in model.encode.call_args_list[1:]] == [4, 2]
+    assert set(threads) == {"embed-model"}
+    assert server.stats()["forward_passes"] == 3
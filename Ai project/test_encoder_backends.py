@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from encoder_backends import cosine_drift, load_sentence_transformer, skill_vocabulary
+from model_registry import backend_suffix
+
+
+def test_cosine_drift_identical_and_perturbed():
+    """
+    White-Box Path:
+    Identical matrices give cosine 1 and full neighbour agreement;
+    a small perturbation lowers the cosine but keeps neighbours
+    """
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=(50, 16)).astype(np.float32)
+
+    same = cosine_drift(reference, reference)
+    assert same["min_cosine"] == pytest.approx(1.0, abs=1e-5)
+    assert same["nearest_neighbour_agreement"] == 1.0
+
+    noisy = cosine_drift(reference, reference + rng.normal(scale=0.01, size=reference.shape))
+    assert 0.99 < noisy["min_cosine"] < 1.0
+    assert noisy["texts"] == 50
+
+
+def test_unknown_backend_and_suffix():
+    """
+    White-Box Path:
+    Unknown backends are rejected; only non-torch backends get a file suffix
+    """
+    with pytest.raises(ValueError):
+        load_sentence_transformer("unused", "fp16")
+    assert backend_suffix("torch") == ""
+    assert backend_suffix("int8") == "-int8"
+
+
+def test_skill_vocabulary_includes_aliases():
+    vocabulary = skill_vocabulary()
+    assert len(vocabulary) == len(set(vocabulary))
+    assert "python" in [v.lower() for v in vocabulary]
@@ -0,0 +1,74 @@
+import zlib
+import numpy as np
+
+from job_index import JobEmbeddingIndex
+
+
+class FakeModel:
+    """Deterministic vector per text; records every text it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        return np.stack([
+            np.random.default_rng(zlib.crc32(t.encode("utf-8"))).normal(size=8).astype(np.float32)
+            for t in texts
+        ])
+
+
+def make_job(job_id, title="Backend Developer", description="APIs", skills=("Python", "SQL")):
+    return {"id": job_id, "title": title, "description": description, "requiredSkills": list(skills)}
+
+
+def test_only_changed_jobs_are_reencoded(tmp_path):
+    """
+    White-Box Path:
+    Unchanged jobs hit the index; a title, description or skills change re-encodes that job only
+    """
+    model = FakeModel()
+    index = JobEmbeddingIndex(model, path=str(tmp_path / "jobs.sqlite3"))
+    jobs = [make_job(1), make_job(2, title="Data Engineer")]
+    index.sync(jobs)
+    assert len(index) == 2
+
+    model.encoded.clear()
+    index.sync(jobs)
+    assert model.encoded == []
+
+    for changed in (
+        make_job(1, title="Senior Backend Developer"),
+        make_job(1, description="APIs and queues"),
+        make_job(1, skills=("Python", "Go")),
+    ):
+        model.encoded.clear()
+        entries = index.sync([changed, jobs[1]])
+        assert model.encoded[0].startswith(changed["title"])
+        assert not any("Data Engineer" in text for text in model.encoded)
+        assert entries[0]["skills"] == sorted(s.lower() for s in changed["requiredSkills"])
+
+
+def test_remove_and_reload_from_disk(tmp_path):
+    """
+    White-Box Path:
+    Rows survive a new instance; removed jobs stay removed; reload does not re-encode
+    """
+    path = str(tmp_path / "jobs.sqlite3")
+    index = JobEmbeddingIndex(FakeModel(), path=path)
+    first, second = index.sync([make_job(1), make_job(2, skills=())])
+    assert index.remove(2) is True
+    assert index.remove(2) is False
+
+    model = FakeModel()
+    reloaded = JobEmbeddingIndex(model, path=path)
+    assert set(reloaded.entries) == {"1"}
+    entry = reloaded.sync([make_job(1)])[0]
+    assert model.encoded == []
+    assert entry["skills"] == first["skills"]
+    np.testing.assert_array_equal(entry["text_emb"], first["text_emb"])
+    np.testing.assert_array_equal(entry["skill_embs"], first["skill_embs"])
+
+    # a job without skills round-trips with an empty (0, dim) matrix
+    reloaded.sync([make_job(3, skills=())])
+    assert JobEmbeddingIndex(FakeModel(), path=path).entries["3"]["skill_embs"].shape == (0, 8)
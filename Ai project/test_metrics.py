@@ -0,0 +1,39 @@
+import metrics
+from metrics import Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    White-Box Path:
+    Observations land in the first fitting bucket, rendered cumulatively with sum and count
+    """
+    histogram = Histogram("test_latency_seconds", "Test latency.", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="encode")
+    histogram.observe(0.5, stage="encode")
+    histogram.observe(5.0, stage="encode")
+
+    lines = histogram.render().splitlines()
+
+    assert 'test_latency_seconds_bucket{stage="encode",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="encode",le="1.0"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="encode",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_sum{stage="encode"} 5.55' in lines
+    assert 'test_latency_seconds_count{stage="encode"} 3' in lines
+    metrics.REGISTRY.remove(histogram)
+
+
+def test_request_timings_feed_server_timing_header():
+    """
+    White-Box Path:
+    Stages recorded inside a request are summed per stage; outside a request they are not kept
+    """
+    metrics.record("encode", 0.5)
+    metrics.start_request()
+    metrics.record("encode", 0.010)
+    metrics.record("encode", 0.005)
+    metrics.record("similarity", 0.002)
+    timings = metrics.finish_request()
+
+    assert metrics.server_timing_header(timings) == (
+        'encode;dur=15.00;desc="2x", similarity;dur=2.00;desc="1x"'
+    )
@@ -0,0 +1,46 @@
+import threading
+from unittest.mock import MagicMock
+
+from model_registry import ModelRegistry, LazyModel
+
+
+def test_model_loaded_once_on_first_use():
+    """
+    White-Box Path:
+    Nothing loads at registration; concurrent first uses share one load
+    """
+    registry = ModelRegistry()
+    loader = MagicMock(return_value={"edu": 1})
+    registry.register("edu_importance", loader)
+    lazy = LazyModel("edu_importance", registry)
+
+    assert loader.call_count == 0
+    assert registry.status()["edu_importance"]["loaded"] is False
+
+    threads = [threading.Thread(target=lambda: lazy.get("edu")) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert loader.call_count == 1
+    assert lazy.get("edu") == 1
+    assert registry.status()["edu_importance"]["loaded"] is True
+
+
+def test_ready_after_warm_up():
+    """
+    White-Box Path:
+    No warm-up -> always ready; warm-up requested -> ready once every model loaded
+    """
+    registry = ModelRegistry()
+    registry.register("a", lambda: "A")
+    registry.register("b", lambda: "B")
+    assert registry.ready is True
+
+    registry.warmup_requested = True
+    assert registry.ready is False
+
+    registry.warm_up(background=False)
+    assert registry.ready is True
+    assert registry.is_loaded("a") and registry.is_loaded("b")
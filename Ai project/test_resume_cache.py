@@ -0,0 +1,55 @@
+from unittest.mock import patch
+
+from resume_cache import ResumeCache
+
+
+def test_hit_counts_saved_llm_time():
+    """
+    White-Box Path:
+    Stored result is returned for both keys and LLM time is credited
+    """
+    cache = ResumeCache(path=":memory:")
+    result = {"parser_output": {"skills": ["python"]}, "email": "a@b.com"}
+    cache.put([("file", "f1"), ("text", "t1")], result, llm_seconds=2.5)
+
+    assert cache.get("file", "f1") == result
+    assert cache.get("text", "t1") == result
+    assert cache.get("file", "missing") is None
+
+    stats = cache.stats()
+    assert stats["file_hits"] == 1
+    assert stats["text_hits"] == 1
+    assert stats["llm_seconds_saved"] == 5.0
+
+
+def test_ttl_expiry():
+    """
+    White-Box Path:
+    Entry older than ttl -> miss
+    """
+    cache = ResumeCache(path=":memory:", ttl=10)
+    with patch("resume_cache.time.time", return_value=1000.0):
+        cache.put([("file", "f1")], {"x": 1})
+    with patch("resume_cache.time.time", return_value=1011.0):
+        assert cache.get("file", "f1") is None
+
+
+def test_size_cap_evicts_least_recently_used():
+    """
+    White-Box Path:
+    Over max_entries -> oldest accessed entry dropped
+    """
+    cache = ResumeCache(path=":memory:", max_entries=2)
+    with patch("resume_cache.time.time", return_value=1.0):
+        cache.put([("file", "a")], {"v": "a"})
+    with patch("resume_cache.time.time", return_value=2.0):
+        cache.put([("file", "b")], {"v": "b"})
+    with patch("resume_cache.time.time", return_value=3.0):
+        cache.get("file", "a")
+    with patch("resume_cache.time.time", return_value=4.0):
+        cache.put([("file", "c")], {"v": "c"})
+
+    with patch("resume_cache.time.time", return_value=5.0):
+        assert cache.get("file", "b") is None
+        assert cache.get("file", "a") == {"v": "a"}
+        assert cache.get("file", "c") == {"v": "c"}
@@ -198,6 +198,16 @@ async rejectTheUseraftertheinterview(
     return await this.companyManagementService.getApplicantsForJob(jobId,currentUser.id)
   }
 
+  @Post("company/job/:jobId/applicants/rerank")
+  @Roles(CompanyRole.COMPANY)
+  @UseGuards(JwtAuthGuard,RolesGuard)
+  async rerankApplicants(
+    @Param('jobId',ParseIntPipe)jobId:number,
+    @CurrentUser()currentUser:any
+  ){
+    return await this.companyManagementService.rerankApplicants(jobId,currentUser.id)
+  }
+
 @Post('create-company')
 @Roles(UserRole.ADMIN)
 @UseGuards(JwtAuthGuard, RolesGuard)
@@ -17,6 +17,15 @@ import { Request } from 'express';
 import { MailService } from '../user/gobal/MailService';
 import { CACHE_MANAGER } from '@nestjs/cache-manager';
 import { Cache } from 'cache-manager';
+import axios from 'axios';
+import * as readline from 'readline';
+
+interface RankedApplicant {
+  id: number;
+  acceptance_score?: number;
+  estimated_salary?: number;
+  error?: string;
+}
 
 
 @Injectable()
@@ -512,6 +521,68 @@ public async getCompanyById(id: number): Promise<CompanyEntity> {
 }
 
 
+public async rerankApplicants(jobId: number, companyId: number) {
+  const job = await this.jobsRepository.findOne({
+    where: { id: jobId },
+    relations: ['company'],
+  });
+  if (!job) throw new NotFoundException(`job with ${jobId} not found`);
+  if (job.company.id !== companyId)
+    throw new ForbiddenException('You are not allowed to rank applicants for this job');
+
+  const applications = await this.jobApplyRepository.find({
+    where: { job: { id: jobId } },
+    relations: ['resume'],
+  });
+  const withResume = applications.filter(app => app.resume);
+  if (!withResume.length) return [];
+
+  // one bulk call; results arrive as NDJSON, one applicant per line
+  const flaskRes = await axios.post(
+    'http://localhost:5000/rank-applicants',
+    {
+      job: {
+        job_title: job.title,
+        job_required_skills: job.requiredSkills || [],
+        job_description: job.description || '',
+      },
+      candidates: withResume.map(app => ({
+        id: app.id,
+        candidate_skills: app.resume.extracted_skills || [],
+        candidate_experience: app.resume.experience_years || 1,
+        candidate_education: app.resume.education?.length
+          ? app.resume.education
+          : ['Bachelor'],
+      })),
+    },
+    { responseType: 'stream' },
+  );
+
+  const byId = new Map(withResume.map(app => [app.id, app]));
+  const lines = readline.createInterface({ input: flaskRes.data, crlfDelay: Infinity });
+  const updated: JobApplyEntity[] = [];
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+    const ranked: RankedApplicant = JSON.parse(line);
+    const app = byId.get(ranked.id);
+    if (!app || ranked.error || ranked.acceptance_score === undefined) continue;
+
+    app.acceptance_score = ranked.acceptance_score;
+    app.ranking_score = ranked.acceptance_score;
+
+    let finalSalary = Math.floor((ranked.estimated_salary ?? 0) / 10) * 10;
+    if (ranked.acceptance_score < 0.4) finalSalary = Math.floor(finalSalary * 0.7);
+    else if (ranked.acceptance_score < 0.7) finalSalary = Math.floor(finalSalary * 0.85);
+    app.estimated_salary = finalSalary;
+
+    updated.push(await this.jobApplyRepository.save(app));
+  }
+
+  return updated.sort((a, b) => b.ranking_score - a.ranking_score);
+}
+
+
 public async getApplicantsForJob(jobId: number, companyId: number) {
   const job=await this.jobsRepository.findOne({
     where:{
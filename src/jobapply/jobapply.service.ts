@@ -29,6 +29,10 @@ interface AcceptanceResponse {
   description_match?: number;
 }
 
+interface ApplicationScoreResponse extends AcceptanceResponse, SalaryResponse {
+  job_category?: string;
+}
+
 @Injectable()
 export class JobapplyService {
   constructor(
@@ -85,22 +89,7 @@ async applyToJob(jobId: number,currentUser: any,createJobApplyDto: CreateJobAppl
   let savedApp = await this.jobApplyEntity.save(newApplication);
 
 
-  const acceptancePayload = {
-    candidate_skills: resume.extracted_skills || [],
-    job_title: job.title,
-    job_required_skills: job.requiredSkills || [],
-    job_description: job.description || '',
-  };
-
-  const acceptanceResp = await axios.post<AcceptanceResponse>(
-    'http://localhost:5000/predict-acceptance',
-    acceptancePayload,
-  );
-
-  const acceptanceScore = acceptanceResp.data.acceptance_score;
-  savedApp.acceptance_score = acceptanceScore;
-  savedApp.ranking_score=acceptanceScore
-  const salaryPayload = {
+  const scorePayload = {
     candidate_skills: resume.extracted_skills || [],
     candidate_experience: resume.experience_years || 1,
     candidate_education:
@@ -109,15 +98,21 @@ async applyToJob(jobId: number,currentUser: any,createJobApplyDto: CreateJobAppl
         : ['Bachelor'],
     job_title: job.title,
     job_required_skills: job.requiredSkills || [],
+    job_description: job.description || '',
     job_required_experience: job.requiredExperience || 0,
   };
 
-  const salaryResp = await axios.post<SalaryResponse>(
-    'http://localhost:5000/predict-salary',
-    salaryPayload,
+  // acceptance + salary from one encoding pass on the Flask side
+  const scoreResp = await axios.post<ApplicationScoreResponse>(
+    'http://localhost:5000/score-application',
+    scorePayload,
   );
 
-  let finalSalary = Math.floor(salaryResp.data.estimated_salary / 10) * 10;
+  const acceptanceScore = scoreResp.data.acceptance_score;
+  savedApp.acceptance_score = acceptanceScore;
+  savedApp.ranking_score=acceptanceScore
+
+  let finalSalary = Math.floor(scoreResp.data.estimated_salary / 10) * 10;
 
   if (acceptanceScore < 0.4) finalSalary = Math.floor(finalSalary * 0.7);
   else if (acceptanceScore < 0.7) finalSalary = Math.floor(finalSalary * 0.85);
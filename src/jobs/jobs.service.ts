@@ -20,6 +20,8 @@ interface FlaskEmbeddingResponse {
   embedding: number[];
 }
 
+const FLASK_JOB_INDEX_URL = 'http://localhost:5000/jobs/index';
+
 @Injectable()
 export class JobsService {
   constructor(
@@ -58,7 +60,9 @@ async createJob(createJobDto: CreateJobDto, companyId: number, company: any): Pr
     requiredSkills: skills,
   });
 
-  return await this.jobRepository.save(job);
+  const savedJob = await this.jobRepository.save(job);
+  await this.indexJob(savedJob);
+  return savedJob;
 }
 
 
@@ -175,7 +179,9 @@ async getJobDetails(id: number): Promise<JobDetailDto> {
     }
 
     Object.assign(job, updateDto);
-    return await this.jobRepository.save(job);
+    const savedJob = await this.jobRepository.save(job);
+    await this.indexJob(savedJob);
+    return savedJob;
   }
 
   async deleteJob(id: number, actor: any): Promise<{ message: string }> {
@@ -190,9 +196,36 @@ async getJobDetails(id: number): Promise<JobDetailDto> {
     }
 
     await this.jobRepository.remove(job);
+    await this.removeIndexedJob(id);
     return { message: 'Job deleted successfully' };
   }
 
+  // keep the Flask job-embedding index in step with posted / closed jobs
+  private async indexJob(job: JobEntity): Promise<void> {
+    try {
+      await axios.post(FLASK_JOB_INDEX_URL, {
+        jobs: [
+          {
+            id: job.id,
+            title: job.title,
+            description: job.description,
+            requiredSkills: job.requiredSkills || [],
+          },
+        ],
+      });
+    } catch (err) {
+      console.error(`Failed to index job ${job.id}:`, err.message);
+    }
+  }
+
+  private async removeIndexedJob(id: number): Promise<void> {
+    try {
+      await axios.delete(`${FLASK_JOB_INDEX_URL}/${id}`);
+    } catch (err) {
+      console.error(`Failed to remove job ${id} from index:`, err.message);
+    }
+  }
+
 
 
 